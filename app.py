@@ -1,33 +1,44 @@
 from flask import Flask
 import logging
 from config.database import DatabasePool
+from config.settings import get_settings
+from controllers.converters import PositiveIntConverter
+from controllers.responses import ORJSONProvider
+from controllers.AutorController import autor_bp
+from controllers.LibroController import libro_bp
 import atexit
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s'
-)
-
-port = int(os.getenv("PORT", 5000))
 
 def create_app():
     app = Flask(__name__)
+    # jsonify y las respuestas dict de Flask serializan con orjson
+    app.json = ORJSONProvider(app)
+
+    # Conversor <pint:id>; debe registrarse antes que los blueprints que lo usan
+    app.url_map.converters["pint"] = PositiveIntConverter
 
     # Registrar blueprint
+    app.register_blueprint(autor_bp)
+    app.register_blueprint(libro_bp)
 
     # Cerrar pool al finalizar la app
     db_pool = DatabasePool()
     atexit.register(db_pool.close_all_connections)
+    # Devolver al pool la conexión de cada petición al terminarla
+    app.teardown_appcontext(db_pool.release_request_connection)
     logging.info("Pool de conexiones inicializado")
 
     return app
 
 if __name__ == "__main__":
+    # Configurar logging solo al ejecutar directamente: bajo gunicorn lo configura el servidor
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        force=True
+    )
+
+    settings = get_settings()
     app = create_app()
-    logging.info(f"App desplegada en puerto {port}")
-    app.run(host="0.0.0.0", port=port, debug=True)
+    logging.info("App desplegada en puerto %s", settings.port)
+    # El modo debug solo se activa con FLASK_DEBUG=1 (antes estaba siempre activo)
+    app.run(host="0.0.0.0", port=settings.port, debug=settings.debug)
@@ -0,0 +1,131 @@
+
+import logging
+import orjson
+from typing import Any, Dict, List
+from config.settings import get_settings
+
+try:
+    import redis
+except ImportError:  # Redis es opcional: sin la librería la caché queda desactivada
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class RedisCache:
+    """
+    Singleton que gestiona el cliente Redis usado como caché de lecturas.
+    Si REDIS_URL no está configurada (o la librería redis no está instalada)
+    la caché queda desactivada y todas las operaciones son no-op.
+
+    Los valores se guardan como JSON (orjson) y no con pickle: una entrada no
+    depende de la estructura interna de las clases y leerla nunca ejecuta código.
+    """
+    _instance = None
+    _client = None
+
+    def __new__(cls):
+        """
+        Implementación del patrón Singleton.
+        Solo crea el cliente la primera vez que se llama.
+        """
+        if cls._instance is None:
+            settings = get_settings()
+
+            cls._instance = super().__new__(cls)
+            cls._instance.ttl = settings.cache_ttl
+
+            if settings.redis_url and redis is not None:
+                cls._instance._client = redis.Redis(
+                    connection_pool=redis.ConnectionPool.from_url(settings.redis_url)
+                )
+
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si hay un servidor Redis configurado."""
+        return self._client is not None
+
+    def get(self, key: str):
+        """
+        Obtiene un valor de la caché.
+
+        Args:
+            key: Clave a buscar
+
+        Returns:
+            Valor JSON decodificado o None si no existe (o Redis no responde)
+        """
+        if not self._client:
+            return None
+        try:
+            value = self._client.get(key)
+        except redis.RedisError as e:
+            logger.warning("Error leyendo %s de Redis: %s", key, e)
+            return None
+        return orjson.loads(value) if value is not None else None
+
+    def set(self, key: str, value) -> None:
+        """
+        Guarda un valor en la caché con el TTL configurado (SETEX).
+
+        Args:
+            key: Clave a guardar
+            value: Datos serializables a JSON (dicts, listas, tipos básicos y fechas)
+        """
+        if not self._client:
+            return
+        try:
+            self._client.setex(key, self.ttl, orjson.dumps(value))
+        except redis.RedisError as e:
+            logger.warning("Error guardando %s en Redis: %s", key, e)
+
+    def get_many(self, keys: List[str]) -> List:
+        """
+        Obtiene varios valores de la caché en un único MGET.
+
+        Args:
+            keys: Claves a buscar
+
+        Returns:
+            Lista de valores en el mismo orden que keys (None en los fallos)
+        """
+        if not self._client or not keys:
+            return [None] * len(keys)
+        try:
+            values = self._client.mget(keys)
+        except redis.RedisError as e:
+            logger.warning("Error leyendo %d claves de Redis: %s", len(keys), e)
+            return [None] * len(keys)
+        return [orjson.loads(value) if value is not None else None for value in values]
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """
+        Guarda varios valores con el TTL configurado en un único pipeline.
+
+        Args:
+            items: Diccionario {clave: valor}
+        """
+        if not self._client or not items:
+            return
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, self.ttl, orjson.dumps(value))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Error guardando %d claves en Redis: %s", len(items), e)
+
+    def delete(self, *keys: str) -> None:
+        """
+        Elimina una o varias claves de la caché.
+
+        Args:
+            keys: Claves a invalidar
+        """
+        if not self._client or not keys:
+            return
+        try:
+            self._client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning("Error invalidando %s en Redis: %s", keys, e)
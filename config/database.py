@@ -1,11 +1,16 @@
 
 import psycopg2
 from psycopg2 import pool
-import os
-from dotenv import load_dotenv
+from flask import g, has_app_context
+import logging
+import threading
+import weakref
+from config.settings import get_settings
 
-# Cargar variables de entorno
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# A partir de este número de sentencias preparadas en una conexión se liberan al devolverla al pool
+MAX_PREPARED_POR_CONEXION = 100
 
 class DatabasePool:
     """
@@ -14,6 +19,9 @@ class DatabasePool:
     """
     _instance = None
     _pool = None
+    _prepared = None
+    _prepared_lock = None
+    _configured = None
 
     def __new__(cls):
         """
@@ -21,26 +29,40 @@ class DatabasePool:
         Solo crea una instancia la primera vez que se llama.
         """
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-
-            db_name = os.getenv('DB_NAME')
-            db_user = os.getenv('DB_USER')
-            db_password = os.getenv('DB_PASSWORD')
-
-            if not all([db_name, db_user, db_password]):
-                raise ValueError("❌ Variables de entorno para la BD no configuradas correctamente")
+            # La configuración se valida al construirse (lanza ValueError si falta algo)
+            settings = get_settings()
 
+            cls._instance = super().__new__(cls)
 
-            cls._instance._pool = pool.SimpleConnectionPool(
-                minconn=2,   # Mínimo de conexiones siempre abiertas
-                maxconn=10,  # Máximo de conexiones permitidas
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '5432'),
-                database=db_name,
-                user=db_user,
-                password=os.getenv('DB_PASSWORD')
+            # ThreadedConnectionPool es thread-safe: varios hilos de Flask pueden pedir conexiones a la vez
+            cls._instance._pool = pool.ThreadedConnectionPool(
+                minconn=settings.db_pool_min,  # Mínimo de conexiones siempre abiertas
+                maxconn=settings.db_pool_max,  # Máximo de conexiones permitidas
+                host=settings.db_host,
+                port=settings.db_port,
+                database=settings.db_name,
+                user=settings.db_user,
+                password=settings.db_password,
+                connect_timeout=settings.db_connect_timeout,
+                # Keepalives TCP: detectar conexiones muertas (NAT, caídas de red) en ~1 minuto
+                keepalives=1,
+                keepalives_idle=30,
+                keepalives_interval=10,
+                keepalives_count=3,
+                # Ninguna query ni transacción olvidada puede retener una conexión indefinidamente
+                options=(
+                    f"-c statement_timeout={settings.db_statement_timeout_ms} "
+                    f"-c idle_in_transaction_session_timeout={settings.db_idle_in_transaction_timeout_ms} "
+                    "-c jit=off"
+                )
             )
 
+            # Sentencias preparadas en cada conexión; las conexiones descartadas desaparecen solas
+            cls._instance._prepared = weakref.WeakKeyDictionary()
+            cls._instance._prepared_lock = threading.Lock()
+            # Conexiones a las que ya se aplicó set_session
+            cls._instance._configured = weakref.WeakSet()
+
         return cls._instance
     
     def get_connection(self):
@@ -51,9 +73,47 @@ class DatabasePool:
             connection: Conexión a PostgreSQL
         """
         if self._pool:
-            return self._pool.getconn()
+            connection = self._pool.getconn()
+            # La sesión se configura una sola vez por conexión, no en cada checkout
+            with self._prepared_lock:
+                configured = connection in self._configured
+            if not configured:
+                connection.set_session(isolation_level='READ COMMITTED', autocommit=False)
+                # Solo se marca si set_session no falló: si no, se reintenta en el siguiente checkout
+                with self._prepared_lock:
+                    self._configured.add(connection)
+            return connection
         raise Exception("Pool no inicializado")
     
+    def request_connection(self):
+        """
+        Obtiene la conexión ligada a la petición HTTP actual.
+        
+        La primera llamada dentro de una petición toma una conexión del pool y la
+        guarda en flask.g; las siguientes la reutilizan. Se devuelve al pool al
+        terminar la petición (ver release_request_connection).
+        
+        Returns:
+            connection: Conexión de la petición, o None fuera de un contexto de Flask
+        """
+        if not has_app_context():
+            return None
+        if "db_conn" not in g:
+            g.db_conn = self.get_connection()
+        return g.db_conn
+    
+    def release_request_connection(self, exception=None):
+        """
+        Devuelve al pool la conexión de la petición actual, si se llegó a usar.
+        Registrar con app.teardown_appcontext.
+        
+        Args:
+            exception: Excepción que terminó la petición (la pasa Flask)
+        """
+        connection = g.pop("db_conn", None)
+        if connection is not None:
+            self.release_connection(connection)
+    
     def release_connection(self, connection):
         """
         Devuelve una conexión al pool para ser reutilizada.
@@ -62,7 +122,41 @@ class DatabasePool:
             connection: Conexión a devolver
         """
         if self._pool:
-            self._pool.putconn(connection)
+            if not connection.closed and len(self._prepared.get(connection, ())) > MAX_PREPARED_POR_CONEXION:
+                connection.rollback()
+                with connection.cursor() as cursor:
+                    cursor.execute("DEALLOCATE ALL")
+                connection.commit()
+                with self._prepared_lock:
+                    self._prepared.pop(connection, None)
+
+            # Las conexiones rotas se descartan en lugar de volver al pool
+            self._pool.putconn(connection, close=connection.closed != 0)
+    
+    def execute_prepared(self, cursor, name: str, types: str, statement: str, params: tuple):
+        """
+        Ejecuta una sentencia preparada en la conexión del cursor.
+        
+        La primera vez que se usa en una conexión se registra con PREPARE, de
+        modo que PostgreSQL reutiliza el plan en las siguientes ejecuciones.
+        
+        Args:
+            cursor: Cursor sobre el que ejecutar
+            name: Nombre de la sentencia preparada
+            types: Tipos de los parámetros, p.ej. "int, varchar"
+            statement: SQL con parámetros posicionales $1..$n
+            params: Valores de los parámetros
+        """
+        connection = cursor.connection
+        with self._prepared_lock:
+            prepared = self._prepared.setdefault(connection, set())
+
+        if name not in prepared:
+            cursor.execute(f"PREPARE {name} ({types}) AS {statement}")
+            prepared.add(name)
+
+        placeholders = ", ".join(["%s"] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
     
     def close_all_connections(self):
         """
@@ -71,4 +165,4 @@ class DatabasePool:
         """
         if self._pool:
             self._pool.closeall()
-            print("🔒 Pool de conexiones cerrado")
\ No newline at end of file
+            logger.info("🔒 Pool de conexiones cerrado")
\ No newline at end of file
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import os
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Configuración de la aplicación leída de las variables de entorno.
+    Inmutable: se construye una única vez a través de get_settings().
+    """
+    db_name: Optional[str]
+    db_user: Optional[str]
+    db_password: Optional[str]
+    db_host: str = "localhost"
+    db_port: str = "5432"
+    db_pool_min: int = 2
+    db_pool_max: int = 20
+    db_connect_timeout: int = 3
+    db_statement_timeout_ms: int = 5000
+    db_idle_in_transaction_timeout_ms: int = 10000
+    redis_url: Optional[str] = None
+    cache_ttl: int = 300
+    port: int = 5000
+    debug: bool = False
+
+    def __post_init__(self):
+        """
+        Valida la configuración al construirla.
+
+        Raises:
+            ValueError: Si faltan las credenciales de la BD o el pool está mal dimensionado
+        """
+        if not all([self.db_name, self.db_user, self.db_password]):
+            raise ValueError("❌ Variables de entorno para la BD no configuradas correctamente")
+        if self.db_pool_min < 1 or self.db_pool_max < self.db_pool_min:
+            raise ValueError("❌ DB_POOL_MIN debe ser >= 1 y DB_POOL_MAX >= DB_POOL_MIN")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Carga el .env y las variables de entorno una sola vez.
+
+    Returns:
+        Settings: Configuración compartida por toda la aplicación
+    """
+    load_dotenv()
+
+    # Tamaño del pool: maxconn = peticiones concurrentes + workers en segundo plano * 2 + margen
+    max_concurrent_requests = int(os.getenv('DB_MAX_CONCURRENT_REQUESTS', '10'))
+    background_workers = int(os.getenv('DB_BACKGROUND_WORKERS', '0'))
+    db_pool_max = os.getenv('DB_POOL_MAX') or max_concurrent_requests + background_workers * 2 + 10
+
+    return Settings(
+        db_name=os.getenv('DB_NAME'),
+        db_user=os.getenv('DB_USER'),
+        db_password=os.getenv('DB_PASSWORD'),
+        db_host=os.getenv('DB_HOST', 'localhost'),
+        db_port=os.getenv('DB_PORT', '5432'),
+        db_pool_min=int(os.getenv('DB_POOL_MIN', '2')),
+        db_pool_max=int(db_pool_max),
+        db_connect_timeout=int(os.getenv('DB_CONNECT_TIMEOUT', '3')),
+        db_statement_timeout_ms=int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000')),
+        db_idle_in_transaction_timeout_ms=int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', '10000')),
+        redis_url=os.getenv('REDIS_URL'),
+        cache_ttl=int(os.getenv('CACHE_TTL', '300')),
+        port=int(os.getenv('PORT', '5000')),
+        debug=os.getenv('FLASK_DEBUG', '0') == '1'
+    )
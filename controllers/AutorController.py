@@ -0,0 +1,82 @@
+from flask import Blueprint, Response, request, stream_with_context
+from controllers.responses import json_response
+from services.AutorService import AutorService
+from services.LibroService import LibroService
+import orjson
+import tempfile
+
+autor_bp = Blueprint("autores", __name__, url_prefix="/api/autores")
+
+# El CSV se mantiene en memoria hasta este tamaño; a partir de ahí se vuelca a disco
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+@autor_bp.route("", methods=["GET"])
+def obtener_autores():
+    """
+    Lista los autores.
+
+    Con ?limit=N&offset=M devuelve una página; sin parámetros devuelve todos
+    los autores como un array JSON en streaming, sin cargar la tabla en memoria.
+    """
+    autor_service = AutorService()
+
+    if "limit" in request.args:
+        limit = request.args.get("limit", type=int)
+        # Sin default en get(): así un valor no numérico se detecta como None
+        offset = request.args.get("offset", type=int) if "offset" in request.args else 0
+        if limit is None or offset is None:
+            return json_response({"error": "limit y offset deben ser números enteros"}, 400)
+
+        try:
+            autores = autor_service.obtener_autores_paginados(limit, offset)
+        except ValueError as e:
+            return json_response({"error": str(e)}, 400)
+
+        return json_response({
+            "items": autores,
+            "limit": limit,
+            "offset": offset
+        })
+
+    def generar():
+        yield b"["
+        for i, autor in enumerate(autor_service.iterar_autores()):
+            yield (b"," if i else b"") + orjson.dumps(autor.to_dict())
+        yield b"]"
+
+    return Response(stream_with_context(generar()), mimetype="application/json")
+
+
+@autor_bp.route("/export", methods=["GET"])
+def exportar_autores():
+    """Descarga todos los autores en CSV, generado por PostgreSQL con COPY."""
+    buffer = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    try:
+        AutorService().exportar_autores_csv(buffer)
+    except Exception:
+        buffer.close()
+        raise
+    buffer.seek(0)
+
+    def generar():
+        with buffer:
+            yield from iter(lambda: buffer.read(EXPORT_CHUNK_SIZE), b"")
+
+    return Response(
+        generar(),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=autores.csv"}
+    )
+
+
+@autor_bp.route("/<pint:id>/libros", methods=["GET"])
+def obtener_libros_de_autor(id: int):
+    """Obtiene todos los libros de un autor, cada uno con la información del autor."""
+    try:
+        libros = LibroService().obtener_libros_por_autor(id)
+    except ValueError as e:
+        return json_response({"error": str(e)}, 404)
+
+    return json_response(libros)
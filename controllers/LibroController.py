@@ -0,0 +1,65 @@
+from flask import Blueprint, Response, request, stream_with_context
+from controllers.responses import json_response
+from services.LibroService import LibroService
+import orjson
+
+libro_bp = Blueprint("libros", __name__, url_prefix="/api/libros")
+
+
+@libro_bp.route("", methods=["GET"])
+def obtener_libros():
+    """
+    Lista los libros.
+
+    Con ?page_size=N (y opcionalmente &after_id=M) devuelve una página de libros
+    y el cursor de la siguiente; sin parámetros devuelve todos los libros como un
+    array JSON en streaming, sin cargar la tabla en memoria. En ambos casos cada
+    libro incluye su autor.
+    """
+    libro_service = LibroService()
+
+    if "page_size" in request.args or "after_id" in request.args:
+        # Sin default en get(): así un valor no numérico se detecta como None
+        page_size = request.args.get("page_size", type=int) if "page_size" in request.args else 50
+        after_id = request.args.get("after_id", type=int)
+        if page_size is None or ("after_id" in request.args and after_id is None):
+            return json_response({"error": "page_size y after_id deben ser números enteros"}, 400)
+
+        try:
+            libros, next_cursor = libro_service.obtener_todos_libros(page_size, after_id)
+        except ValueError as e:
+            return json_response({"error": str(e)}, 400)
+
+        return json_response({
+            "items": libros,
+            "page_size": page_size,
+            "next_cursor": next_cursor
+        })
+
+    def generar():
+        yield b"["
+        for i, libro in enumerate(libro_service.iterar_libros()):
+            yield (b"," if i else b"") + orjson.dumps(libro)
+        yield b"]"
+
+    return Response(stream_with_context(generar()), mimetype="application/json")
+
+
+@libro_bp.route("/<pint:id>", methods=["GET"])
+def obtener_libro(id: int):
+    """Obtiene un libro por su ID con la información de su autor."""
+    libro = LibroService().obtener_libro_por_id(id)
+
+    if libro is None:
+        return json_response({"error": f"Libro con ID {id} no encontrado"}, 404)
+
+    return json_response(libro)
+
+
+@libro_bp.route("/<pint:id>", methods=["DELETE"])
+def eliminar_libro(id: int):
+    """Elimina un libro por su ID."""
+    if not LibroService().eliminar_libro(id):
+        return json_response({"error": f"Libro con ID {id} no encontrado"}, 404)
+
+    return Response(status=204)
@@ -0,0 +1,11 @@
+from werkzeug.routing import IntegerConverter
+
+
+class PositiveIntConverter(IntegerConverter):
+    """
+    Conversor de rutas para IDs: solo acepta enteros positivos sin ceros a la izquierda.
+
+    Un ID como 0 o -1 ni siquiera casa con la ruta (404), así que los
+    servicios no necesitan volver a comprobarlo. Se registra como 'pint'.
+    """
+    regex = r"[1-9]\d*"
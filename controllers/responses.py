@@ -0,0 +1,62 @@
+from flask import Response
+from flask.json.provider import JSONProvider
+import orjson
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """
+    Serializa los objetos que orjson no conoce.
+
+    Los modelos (Libro, Autor) usan __slots__ y no los serializa orjson por sí
+    mismo; se convierten con su to_dict, de modo que los controllers pueden
+    devolver entidades directamente.
+    """
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Objeto de tipo {type(obj).__name__} no serializable a JSON")
+    return to_dict()
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """
+    Serializa payload con orjson y lo envuelve en una respuesta JSON.
+
+    orjson serializa date/datetime de forma nativa (ISO 8601), por lo que los
+    modelos no necesitan convertir fechas en to_dict.
+
+    Args:
+        payload: Diccionario, lista o entidad a serializar
+        status: Código HTTP de la respuesta
+
+    Returns:
+        Response con mimetype application/json
+    """
+    return Response(
+        orjson.dumps(payload, default=_default, option=_ORJSON_OPTIONS),
+        status=status,
+        mimetype="application/json"
+    )
+
+
+class ORJSONProvider(JSONProvider):
+    """
+    Proveedor JSON de Flask basado en orjson.
+
+    Se registra como app.json para que jsonify, los dict devueltos por las
+    vistas y request.get_json usen orjson en lugar del módulo json estándar.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS),
+            mimetype="application/json"
+        )
@@ -0,0 +1,15 @@
+-- Esquema inicial: tablas de autores y libros
+CREATE TABLE IF NOT EXISTS autores (
+    id SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    nacionalidad VARCHAR(50),
+    fecha_nacimiento DATE
+);
+
+CREATE TABLE IF NOT EXISTS libros (
+    id SERIAL PRIMARY KEY,
+    titulo VARCHAR(200) NOT NULL,
+    isbn VARCHAR(13) UNIQUE NOT NULL,
+    anio_publicacion INTEGER,
+    autor_id INTEGER REFERENCES autores(id) ON DELETE CASCADE
+);
@@ -0,0 +1,6 @@
+-- Índice para las búsquedas de libros por autor (get_libros_from_autor,
+-- get_libros_by_autor_ids y el borrado en cascada de autores).
+-- CONCURRENTLY no bloquea escrituras, pero no puede ejecutarse dentro de
+-- una transacción: lanzar con psql sin --single-transaction.
+-- libros.isbn no necesita índice propio: su restricción UNIQUE ya lo crea.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS libros_autor_id_idx ON libros (autor_id);
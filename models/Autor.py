@@ -11,6 +11,8 @@ class Autor:
     - Encapsulación: atributos y métodos bien definidos
     """
 
+    __slots__ = ("id", "nombre", "nacionalidad", "fecha_nacimiento")
+
     def __init__(
         self,
         id: Optional[int] = None,
@@ -27,6 +29,7 @@ class Autor:
         """
         Convierte el autor a un diccionario.
         Útil para serializar a JSON en las respuestas de la API.
+        La fecha se deja como date: orjson la serializa en ISO 8601.
         
         Returns:
             dict: Representación del autor
@@ -35,16 +38,40 @@ class Autor:
             "id":self.id,
             "nombre":self.nombre,
             "nacionalidad":self.nacionalidad,
-            "fecha_nacimiento": self.fecha_nacimiento.isoformat() if self.fecha_nacimiento else None
+            "fecha_nacimiento": self.fecha_nacimiento
         }
     
+    @staticmethod
+    def from_dict(datos: Dict[str, Any]) -> 'Autor':
+        """
+        Factory method para crear un Autor desde un diccionario
+        (p.ej. los datos ya validados de una petición o una entrada de caché).
+        
+        Args:
+            datos: Diccionario con {nombre, nacionalidad, fecha_nacimiento} y opcionalmente id;
+                la fecha puede llegar como date o como texto ISO (YYYY-MM-DD)
+        
+        Returns:
+            Autor
+        """
+        fecha_nacimiento = datos.get("fecha_nacimiento")
+        if isinstance(fecha_nacimiento, str):
+            fecha_nacimiento = date.fromisoformat(fecha_nacimiento)
+        
+        return Autor(
+            id=datos.get("id"),
+            nombre=datos.get("nombre", ""),
+            nacionalidad=datos.get("nacionalidad"),
+            fecha_nacimiento=fecha_nacimiento
+        )
+    
     @staticmethod
     def from_db_row(row) -> Optional['Autor']:
         """
         Factory method para crear un Autor desde una fila de base de datos.
         
         Args:
-            row: Tupla con (id, nombre, nacionalidad, fecha_nacimiento)
+            row: Tupla con (id, nombre, nacionalidad, fecha_nacimiento), en ese orden
         
         Returns:
             Autor o None si row está vacía
@@ -53,10 +80,10 @@ class Autor:
             return None
         
         return Autor(
-            id=row['id'],
-            nombre=row['nombre'],
-            nacionalidad=row['nacionalidad'],
-            fecha_nacimiento=row['fecha_nacimiento']
+            id=row[0],
+            nombre=row[1],
+            nacionalidad=row[2],
+            fecha_nacimiento=row[3]
         )
     
     def __repr__(self) -> str:
@@ -64,7 +91,17 @@ class Autor:
         return f"<Autor(id={self.id}, nombre='{self.nombre}')>"
     
     def __eq__(self, other) -> bool:
-        """Compara dos autores por ID."""
-        if not isinstance(other, Autor):
-            return False
-        return self.id == other.id if self.id and other.id else False
\ No newline at end of file
+        """
+        Compara dos autores por ID.
+        
+        Una entidad sin guardar (id=None) solo es igual a sí misma.
+        """
+        if type(other) is not type(self):
+            return NotImplemented
+        if self.id is None:
+            return self is other
+        return self.id == other.id
+    
+    def __hash__(self) -> int:
+        """Hash coherente con __eq__: por ID, o por identidad si aún no se ha guardado."""
+        return hash(self.id) if self.id is not None else object.__hash__(self)
\ No newline at end of file
@@ -3,6 +3,8 @@ from typing import Optional, Dict, Any
 
 class Libro:
 
+    __slots__ = ("id", "titulo", "isbn", "anio_publicacion", "autor_id")
+
     def __init__(
         self,
         titulo:str, 
@@ -40,11 +42,34 @@ class Libro:
             "autor_id":self.autor_id
         }
 
+    @staticmethod
+    def from_dict(datos: Dict[str, Any]) -> 'Libro':
+        """
+        Factory method para crear un Libro desde un diccionario
+        (p.ej. los datos ya validados de una petición o una entrada de caché).
+        
+        Args:
+            datos: Diccionario con {titulo, isbn, anio_publicacion, autor_id} y opcionalmente id
+        
+        Returns:
+            Libro
+        """
+        return Libro(
+            id=datos.get("id"),
+            titulo=datos["titulo"],
+            isbn=datos["isbn"],
+            anio_publicacion=datos.get("anio_publicacion"),
+            autor_id=datos.get("autor_id")
+        )
+
     @staticmethod
     def from_db_row(row) -> Optional['Libro']:
         """
         Factory method para crear un Libro desde una fila de base de datos.
         
+        Args:
+            row: Tupla con (id, titulo, isbn, anio_publicacion, autor_id), en ese orden
+        
         Returns:
             Libro o None si row está vacía
         """
@@ -52,11 +77,11 @@ class Libro:
             return None
         
         return Libro(
-            id=row["id"],
-            titulo=row["titulo"],
-            isbn=row["isbn"],
-            anio_publicacion=row["anio_publicacion"],
-            autor_id=row["autor_id"]
+            id=row[0],
+            titulo=row[1],
+            isbn=row[2],
+            anio_publicacion=row[3],
+            autor_id=row[4]
         )
     
     def __repr__(self) -> str:
@@ -64,7 +89,17 @@ class Libro:
         return f"<Libro(id={self.id}, titulo='{self.titulo}')>"
     
     def __eq__(self, other) -> bool:
-        """Compara dos autores por ID."""
-        if not isinstance(other, Libro):
-            return False
-        return self.id == other.id if self.id and other.id else False
\ No newline at end of file
+        """
+        Compara dos libros por ID.
+        
+        Una entidad sin guardar (id=None) solo es igual a sí misma.
+        """
+        if type(other) is not type(self):
+            return NotImplemented
+        if self.id is None:
+            return self is other
+        return self.id == other.id
+    
+    def __hash__(self) -> int:
+        """Hash coherente con __eq__: por ID, o por identidad si aún no se ha guardado."""
+        return hash(self.id) if self.id is not None else object.__hash__(self)
\ No newline at end of file
@@ -1,62 +1,80 @@
-from typing import List, Optional, Callable, TypeVar
-from config.database import DatabasePool
-from repositories.BaseRepository import BaseRepository
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TypeVar
+from repositories.PgRepository import PgRepository
+from repositories.CachingRepository import CachingRepository
 import psycopg2.extras
-import logging
+import threading
 from models.Autor import Autor
-logger = logging.getLogger(__name__)
+
+try:
+    from cachetools import TTLCache
+except ImportError:  # cachetools es opcional: sin la librería no hay caché local
+    TTLCache = None
+
 T = TypeVar('T')
 
-class AutorRepository(BaseRepository[Autor]):
+# Caché local del proceso para get_by_id/get_by_ids, delante de Redis: los autores
+# cambian poco comparados con las lecturas que los usan para enriquecer libros.
+#
+# Solo la usan esos dos métodos (GET de un autor y el enriquecimiento por lotes de
+# los listados de libros). Las lecturas con JOIN o RETURNING de LibroRepository
+# (libro por ID, libros de un autor, crear/actualizar libro) leen el autor de la BD
+# y no pasan por ella.
+#
+# La invalidación solo llega al proceso que hace la escritura: con varios workers,
+# los demás pueden servir un autor desactualizado hasta LOCAL_CACHE_TTL segundos.
+LOCAL_CACHE_MAXSIZE = 10000
+LOCAL_CACHE_TTL = 60
+
+# Sentencias preparadas por conexión: nombre -> (tipos de los parámetros, SQL)
+_PREPARED_STATEMENTS = {
+    "autor_get_by_id": (
+        "int",
+        "SELECT id, nombre, nacionalidad, fecha_nacimiento FROM autores WHERE id = $1"
+    ),
+    "autor_add": (
+        "varchar, varchar, date",
+        """
+        INSERT INTO autores (nombre, nacionalidad, fecha_nacimiento)
+        VALUES ($1, $2, $3)
+        RETURNING id, nombre, nacionalidad, fecha_nacimiento
+        """
+    ),
+    "autor_update": (
+        "varchar, varchar, date, int",
+        """
+        UPDATE autores 
+        SET nombre = $1, nacionalidad = $2, fecha_nacimiento = $3
+        WHERE id = $4
+        RETURNING id, nombre, nacionalidad, fecha_nacimiento
+        """
+    ),
+}
+
+class AutorRepository(CachingRepository, PgRepository[Autor]):
     """
     Repositorio concreto para Autores.
     
     Principios SOLID aplicados:
     - SRP: Solo se encarga de la persistencia de Autores
-    - OCP: Extiende BaseRepository sin modificarlo
+    - OCP: Extiende PgRepository sin modificarlo
     - LSP: Puede sustituir a BaseRepository[Autor]
     - ISP: Implementa solo los métodos necesarios
     - DIP: Depende de la abstracción DatabasePool
     
-    Patrón Template Method: _execute_query encapsula la lógica común
+    Patrón Template Method: _execute_query (heredado de PgRepository) encapsula la lógica común
+    Caché read-through en Redis para get_by_id y get_all (ver CachingRepository),
+    más una caché local TTL+LRU compartida entre peticiones para get_by_id/get_by_ids
     """
     
-    def __init__(self):
-        self.db_pool = DatabasePool()
+    _prepared_statements = _PREPARED_STATEMENTS
+    _cache_model = Autor
     
-    def _execute_query(self, operation: Callable, operation_name: str, needs_commit: bool = False):
-        """
-        Template Method: Encapsula la lógica común de manejo de conexiones.
-        
-        Args:
-            operation: Función que recibe cursor y ejecuta la operación
-            operation_name: Nombre de la operación para logging
-            needs_commit: Si la operación requiere commit (INSERT, UPDATE, DELETE)
-            
-        Returns:
-            Resultado de la operación
-        """
-        conn = None
-        try:
-            conn = self.db_pool.get_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            result = operation(cursor)
-            
-            if needs_commit:
-                conn.commit()
-            
-            cursor.close()
-            return result
-            
-        except Exception as e:
-            if conn and needs_commit:
-                conn.rollback()
-            logger.error(f"Error en {operation_name}: {e}")
-            raise
-        finally:
-            if conn:
-                self.db_pool.release_connection(conn)
+    def __init__(self):
+        # TTLCache no es thread-safe y la app atiende cada petición en un hilo
+        self._local_cache = (
+            TTLCache(maxsize=LOCAL_CACHE_MAXSIZE, ttl=LOCAL_CACHE_TTL) if TTLCache is not None else None
+        )
+        self._local_lock = threading.Lock()
     
     def get_by_id(self, id: int) -> Optional[Autor]:
         """
@@ -68,15 +86,60 @@ class AutorRepository(BaseRepository[Autor]):
         Returns:
             Autor o None si no existe
         """
+        autor = self._local_get(id)
+        if autor is not None:
+            return autor
+        
         def operation(cursor):
-            cursor.execute("SELECT * FROM autores WHERE id = %s", (id,))
+            self._execute_prepared(cursor, "autor_get_by_id", (id,))
             row = cursor.fetchone()
             
             if row:
                 return Autor.from_db_row(row)
             return None
         
-        return self._execute_query(operation, f"obtener autor ID {id}")
+        autor = self._cached(
+            f"autor:{id}",
+            lambda: self._execute_query(operation, f"obtener autor ID {id}")
+        )
+        
+        if autor is not None:
+            self._local_set({id: autor})
+        return autor
+    
+    def get_by_ids(self, ids: Iterable[int]) -> Dict[int, Autor]:
+        """
+        Obtiene varios autores por ID en una única query.
+        
+        Reutiliza las entradas de la caché local y de autor:{id} en Redis, y
+        solo consulta la BD para los IDs que no estaban cacheados.
+        
+        Args:
+            ids: IDs de los autores a buscar
+            
+        Returns:
+            Diccionario {id: Autor} con los autores encontrados
+        """
+        def load(missing_ids: List[int]) -> Dict[int, Autor]:
+            def operation(cursor):
+                cursor.execute(
+                    "SELECT id, nombre, nacionalidad, fecha_nacimiento FROM autores WHERE id = ANY(%s)",
+                    (missing_ids,)
+                )
+                return {row[0]: Autor.from_db_row(row) for row in cursor.fetchall()}
+            
+            return self._execute_query(operation, f"obtener {len(missing_ids)} autores por ID")
+        
+        ids = set(ids)
+        result = self._local_get_many(ids)
+        
+        missing = ids.difference(result)
+        if missing:
+            encontrados = self._cached_many(missing, lambda autor_id: f"autor:{autor_id}", load)
+            self._local_set(encontrados)
+            result.update(encontrados)
+        
+        return result
     
     def get_all(self) -> List[Autor]:
         """
@@ -86,12 +149,83 @@ class AutorRepository(BaseRepository[Autor]):
             Lista de autores
         """
         def operation(cursor):
-            cursor.execute("SELECT * FROM autores ORDER BY nombre")
+            cursor.execute("SELECT id, nombre, nacionalidad, fecha_nacimiento FROM autores ORDER BY nombre")
             rows = cursor.fetchall()
             
             return [ Autor.from_db_row(row) for row in rows ]
         
-        return self._execute_query(operation, "obtener todos los autores")
+        return self._cached(
+            "autores:all",
+            lambda: self._execute_query(operation, "obtener todos los autores")
+        )
+    
+    def iter_all(self, page_size: int = 1000) -> Iterator[Autor]:
+        """
+        Recorre todos los autores con un cursor server-side.
+        
+        Las filas llegan de PostgreSQL en bloques de page_size, por lo que la
+        memoria usada es O(page_size) y no O(filas de la tabla).
+        
+        Args:
+            page_size: Filas que se traen en cada viaje a la BD
+            
+        Yields:
+            Autores ordenados por ID
+        """
+        def operation(conn):
+            with conn.cursor(name="autores_iter") as cursor:
+                cursor.itersize = page_size
+                cursor.execute("SELECT id, nombre, nacionalidad, fecha_nacimiento FROM autores ORDER BY id")
+                for row in cursor:
+                    yield Autor.from_db_row(row)
+        
+        return self._stream_query(operation, "recorrer todos los autores")
+    
+    def export_csv(self, out_stream: BinaryIO) -> None:
+        """
+        Vuelca todos los autores en CSV (con cabecera) usando COPY ... TO STDOUT.
+        
+        PostgreSQL genera el CSV directamente, sin construir objetos Autor
+        ni pasar por el serializador JSON.
+        
+        Args:
+            out_stream: Fichero binario donde se escribe el CSV
+        """
+        def operation(cursor):
+            # El statement_timeout global cancelaría el COPY en tablas grandes, justo
+            # el caso para el que existe; SET LOCAL lo desactiva solo en esta transacción
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            cursor.copy_expert(
+                "COPY (SELECT id, nombre, nacionalidad, fecha_nacimiento FROM autores ORDER BY id) "
+                "TO STDOUT WITH CSV HEADER",
+                out_stream
+            )
+            # La transacción de la petición sigue abierta: el resto de queries vuelven al límite
+            cursor.execute("SET LOCAL statement_timeout = DEFAULT")
+        
+        self._execute_query(operation, "exportar autores a CSV")
+    
+    def get_page(self, limit: int, offset: int = 0) -> List[Autor]:
+        """
+        Obtiene una página de autores ordenados por ID.
+        
+        Args:
+            limit: Número máximo de autores a devolver
+            offset: Número de autores a saltar
+            
+        Returns:
+            Lista de autores de la página
+        """
+        def operation(cursor):
+            cursor.execute(
+                "SELECT id, nombre, nacionalidad, fecha_nacimiento FROM autores ORDER BY id LIMIT %s OFFSET %s",
+                (limit, offset)
+            )
+            rows = cursor.fetchall()
+            
+            return [ Autor.from_db_row(row) for row in rows ]
+        
+        return self._execute_query(operation, f"obtener autores (limit {limit}, offset {offset})")
     
     def add(self, entity: Autor) -> Autor:
         """
@@ -104,19 +238,49 @@ class AutorRepository(BaseRepository[Autor]):
             Autor creado con su ID asignado
         """
         def operation(cursor):
-            cursor.execute(
+            self._execute_prepared(
+                cursor, "autor_add",
+                (entity.nombre, entity.nacionalidad, entity.fecha_nacimiento)
+            )
+            
+            row = cursor.fetchone()
+            return Autor.from_db_row(row)
+        
+        autor_creado = self._execute_query(operation, "crear autor", needs_commit=True)
+        self._invalidate("autores:all")
+        return autor_creado
+    
+    def add_many(self, entities: List[Autor]) -> List[Autor]:
+        """
+        Crea varios autores en una única sentencia INSERT.
+        
+        Args:
+            entities: Autores a crear
+            
+        Returns:
+            Autores creados con su ID asignado, en el mismo orden
+        """
+        if not entities:
+            return []
+        
+        def operation(cursor):
+            rows = psycopg2.extras.execute_values(
+                cursor,
                 """
                 INSERT INTO autores (nombre, nacionalidad, fecha_nacimiento)
-                VALUES (%s, %s, %s)
+                VALUES %s
                 RETURNING id, nombre, nacionalidad, fecha_nacimiento
                 """,
-                (entity.nombre, entity.nacionalidad, entity.fecha_nacimiento)
+                [(e.nombre, e.nacionalidad, e.fecha_nacimiento) for e in entities],
+                page_size=500,
+                fetch=True
             )
             
-            row = cursor.fetchone()
-            return Autor.from_db_row(row)
+            return [ Autor.from_db_row(row) for row in rows ]
         
-        return self._execute_query(operation, "crear autor", needs_commit=True)
+        autores_creados = self._execute_query(operation, f"crear {len(entities)} autores", needs_commit=True)
+        self._invalidate("autores:all")
+        return autores_creados
     
     def update(self, entity: Autor) -> Autor:
         """
@@ -129,13 +293,8 @@ class AutorRepository(BaseRepository[Autor]):
             Autor actualizado
         """
         def operation(cursor):
-            cursor.execute(
-                """
-                UPDATE autores 
-                SET nombre = %s, nacionalidad = %s, fecha_nacimiento = %s
-                WHERE id = %s
-                RETURNING id, nombre, nacionalidad, fecha_nacimiento
-                """,
+            self._execute_prepared(
+                cursor, "autor_update",
                 (entity.nombre, entity.nacionalidad, entity.fecha_nacimiento, entity.id)
             )
             
@@ -146,7 +305,35 @@ class AutorRepository(BaseRepository[Autor]):
             
             return Autor.from_db_row(row)
         
-        return self._execute_query(operation, f"actualizar autor ID {entity.id}", needs_commit=True)
+        autor_actualizado = self._execute_query(operation, f"actualizar autor ID {entity.id}", needs_commit=True)
+        self._invalidate(f"autor:{entity.id}", "autores:all")
+        self._local_invalidate(entity.id)
+        return autor_actualizado
+    
+    def update_many(self, entities: List[Autor]) -> None:
+        """
+        Actualiza varios autores en una única transacción.
+        
+        Las sentencias se envían en lotes de 200 con execute_batch, en lugar
+        de un viaje a la BD por autor.
+        
+        Args:
+            entities: Autores con los datos actualizados
+        """
+        if not entities:
+            return
+        
+        def operation(cursor):
+            psycopg2.extras.execute_batch(
+                cursor,
+                "UPDATE autores SET nombre = %s, nacionalidad = %s, fecha_nacimiento = %s WHERE id = %s",
+                [(e.nombre, e.nacionalidad, e.fecha_nacimiento, e.id) for e in entities],
+                page_size=200
+            )
+        
+        self._execute_query(operation, f"actualizar {len(entities)} autores", needs_commit=True)
+        self._invalidate("autores:all", *(f"autor:{e.id}" for e in entities))
+        self._local_invalidate(*(e.id for e in entities))
     
     def delete(self, id: int) -> bool:
         """
@@ -159,7 +346,63 @@ class AutorRepository(BaseRepository[Autor]):
             True si se eliminó, False si no existía
         """
         def operation(cursor):
+            # ON DELETE CASCADE borra también sus libros: se recogen sus IDs para invalidar la caché
+            cursor.execute("SELECT id FROM libros WHERE autor_id = %s", (id,))
+            libro_ids = [row[0] for row in cursor.fetchall()]
+            
             cursor.execute("DELETE FROM autores WHERE id = %s", (id,))
-            return cursor.rowcount > 0
+            return cursor.rowcount > 0, libro_ids
+        
+        eliminado, libro_ids = self._execute_query(operation, f"eliminar autor ID {id}", needs_commit=True)
         
-        return self._execute_query(operation, f"eliminar autor ID {id}", needs_commit=True)
\ No newline at end of file
+        if eliminado:
+            self._invalidate(
+                f"autor:{id}", "autores:all",
+                f"libros:by_autor:{id}", "libros:all",
+                *(f"libro:{libro_id}" for libro_id in libro_ids)
+            )
+            self._local_invalidate(id)
+        
+        return eliminado
+    
+    def _local_get(self, id: int) -> Optional[Autor]:
+        """Devuelve el autor de la caché local, o None si no está (o no hay caché)."""
+        if self._local_cache is None:
+            return None
+        with self._local_lock:
+            return self._local_cache.get(id)
+    
+    def _local_get_many(self, ids: Iterable[int]) -> Dict[int, Autor]:
+        """Versión por lotes de _local_get: devuelve {id: Autor} con los que estaban en caché."""
+        if self._local_cache is None:
+            return {}
+        with self._local_lock:
+            cache = self._local_cache
+            return {id: cache[id] for id in ids if id in cache}
+    
+    def _local_set(self, autores: Dict[int, Autor]) -> None:
+        """Guarda autores en la caché local."""
+        if self._local_cache is None or not autores:
+            return
+        with self._local_lock:
+            self._local_cache.update(autores)
+    
+    def _local_invalidate(self, *ids: int) -> None:
+        """
+        Elimina autores de la caché local.
+        
+        Solo afecta a este proceso: con varios workers los demás pueden servir
+        el valor anterior hasta LOCAL_CACHE_TTL segundos.
+        
+        Args:
+            ids: IDs de los autores a invalidar
+        """
+        if self._local_cache is None:
+            return
+        with self._local_lock:
+            for id in ids:
+                self._local_cache.pop(id, None)
+
+
+# Instancia compartida por los servicios: el repositorio no guarda estado por petición
+autor_repository_singleton = AutorRepository()
@@ -0,0 +1,94 @@
+from functools import cached_property
+from typing import Any, Callable, ClassVar, Dict, Iterable
+from config.cache import RedisCache
+
+
+class CachingRepository:
+    """
+    Mixin de caché read-through para repositorios.
+    
+    Las lecturas consultan primero Redis y, si no hay entrada, ejecutan la
+    query y guardan el resultado. Las escrituras invalidan las claves afectadas.
+    
+    En Redis se guarda el to_dict() de las entidades (o la lista de ellos) y al
+    leer se reconstruyen con _cache_model.from_dict.
+    """
+    
+    # Modelo de las entidades cacheadas por el repositorio (Autor, Libro)
+    _cache_model: ClassVar[type]
+    
+    @cached_property
+    def cache(self) -> RedisCache:
+        """Cliente de caché, resuelto en el primer uso."""
+        return RedisCache()
+    
+    def _cached(self, key: str, loader: Callable):
+        """
+        Devuelve el valor cacheado en key o lo obtiene con loader.
+        
+        Args:
+            key: Clave de caché (p.ej. "autor:1")
+            loader: Función sin argumentos que consulta la BD
+            
+        Returns:
+            Resultado cacheado o recién obtenido
+        """
+        data = self.cache.get(key)
+        if data is not None:
+            return self._from_cache(data)
+        
+        value = loader()
+        if value is not None:
+            self.cache.set(key, self._to_cache(value))
+        return value
+    
+    def _cached_many(self, ids: Iterable[int], key: Callable[[int], str], loader: Callable) -> Dict[int, Any]:
+        """
+        Versión por lotes de _cached.
+        
+        Consulta en un único MGET las claves de todos los ids y solo llama a
+        loader con los que no estaban en caché.
+        
+        Args:
+            ids: Identificadores a obtener
+            key: Función que construye la clave de caché de un id
+            loader: Función que recibe la lista de ids no cacheados y devuelve {id: valor}
+            
+        Returns:
+            Diccionario {id: valor}
+        """
+        ids = list(ids)
+        values = self.cache.get_many([key(i) for i in ids])
+        result = {i: self._from_cache(data) for i, data in zip(ids, values) if data is not None}
+        
+        missing = [i for i in ids if i not in result]
+        if missing:
+            loaded = loader(missing)
+            self.cache.set_many({
+                key(i): self._to_cache(value) for i, value in loaded.items() if value is not None
+            })
+            result.update(loaded)
+        
+        return result
+    
+    def _invalidate(self, *keys: str) -> None:
+        """
+        Elimina de la caché las claves indicadas.
+        
+        Args:
+            keys: Claves a invalidar
+        """
+        self.cache.delete(*keys)
+    
+    def _to_cache(self, value):
+        """Convierte una entidad o lista de entidades en datos serializables a JSON."""
+        if isinstance(value, list):
+            return [entity.to_dict() for entity in value]
+        return value.to_dict()
+    
+    def _from_cache(self, data):
+        """Reconstruye la entidad o lista de entidades a partir de lo guardado por _to_cache."""
+        from_dict = self._cache_model.from_dict
+        if isinstance(data, list):
+            return [from_dict(item) for item in data]
+        return from_dict(data)
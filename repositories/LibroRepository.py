@@ -1,66 +1,174 @@
-from typing import List, Optional, Callable, TypeVar
-from config.database import DatabasePool
-from repositories.BaseRepository import BaseRepository
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from repositories.PgRepository import PgRepository
+from repositories.CachingRepository import CachingRepository
 import psycopg2.extras
-import logging
 from models.Libro import Libro
-logger = logging.getLogger(__name__)
+from models.Autor import Autor
 T = TypeVar('T')
 
+# Columnas de libros en el orden en que se seleccionan (y que espera Libro.from_db_row)
+LIBRO_COLUMNS = ("id", "titulo", "isbn", "anio_publicacion", "autor_id")
 
-class LibroRepository(BaseRepository[Libro]):
+# Columnas de las consultas libros + autores: 0-4 del libro, 5-8 del autor
+_LIBRO_CON_AUTOR_SELECT = (
+    "SELECT l.id, l.titulo, l.isbn, l.anio_publicacion, l.autor_id, "
+    "a.id, a.nombre, a.nacionalidad, a.fecha_nacimiento"
+)
 
-    def __init__(self):
-        self.db_pool = DatabasePool()
+
+def _libro_y_autor_from_row(row) -> Tuple[Optional[Libro], Optional[Autor]]:
+    """
+    Separa una fila de libro + autor en sus dos entidades.
     
-    def _execute_query(self, operation: Callable, operation_name: str, needs_commit: bool = False):
+    Args:
+        row: Tupla con las columnas de _LIBRO_CON_AUTOR_SELECT
+        
+    Returns:
+        (Libro, Autor); cualquiera de los dos es None si el LEFT JOIN no encontró fila
+    """
+    libro = Libro.from_db_row(row[:5]) if row[0] is not None else None
+    autor = Autor.from_db_row(row[5:9]) if row[5] is not None else None
+    return libro, autor
+
+# Sentencias preparadas por conexión: nombre -> (tipos de los parámetros, SQL)
+_PREPARED_STATEMENTS = {
+    "libro_get_by_id": (
+        "int",
+        "SELECT id, titulo, isbn, anio_publicacion, autor_id FROM libros WHERE id = $1"
+    ),
+    "libro_add": (
+        "varchar, varchar, int, int",
+        """
+        INSERT INTO libros (titulo, isbn, anio_publicacion, autor_id)
+        VALUES ($1, $2, $3, $4)
+        RETURNING id, titulo, isbn, anio_publicacion, autor_id
+        """
+    ),
+    # Inserta y devuelve el libro junto con su autor en un único viaje a la BD
+    "libro_add_with_autor": (
+        "varchar, varchar, int, int",
+        """
+        WITH nuevo AS (
+            INSERT INTO libros (titulo, isbn, anio_publicacion, autor_id)
+            VALUES ($1, $2, $3, $4)
+            RETURNING id, titulo, isbn, anio_publicacion, autor_id
+        )
+        SELECT l.id, l.titulo, l.isbn, l.anio_publicacion, l.autor_id,
+               a.id, a.nombre, a.nacionalidad, a.fecha_nacimiento
+        FROM nuevo l
+        LEFT JOIN autores a ON a.id = l.autor_id
         """
-        Template Method: Encapsula la lógica común de manejo de conexiones.
+    ),
+    # Actualiza y devuelve el libro junto con su autor; el CTE "anterior" devuelve
+    # el autor previo para invalidar también su lista en caché
+    "libro_update_with_autor": (
+        "int, varchar, varchar, int, int",
+        """
+        WITH anterior AS (SELECT autor_id FROM libros WHERE id = $1),
+        actualizado AS (
+            UPDATE libros 
+            SET titulo = $2, isbn = $3, anio_publicacion = $4, autor_id = $5
+            WHERE id = $1
+            RETURNING id, titulo, isbn, anio_publicacion, autor_id
+        )
+        SELECT l.id, l.titulo, l.isbn, l.anio_publicacion, l.autor_id,
+               a.id, a.nombre, a.nacionalidad, a.fecha_nacimiento,
+               (SELECT autor_id FROM anterior) AS autor_id_anterior
+        FROM actualizado l
+        LEFT JOIN autores a ON a.id = l.autor_id
+        """
+    ),
+}
+
+
+class LibroRepository(CachingRepository, PgRepository[Libro]):
+
+    _prepared_statements = _PREPARED_STATEMENTS
+    _cache_model = Libro
+
+    def get_by_id(self, id: int) -> Optional[Libro]:
+        """
+        Obtiene un libro por su ID.
         
         Args:
-            operation: Función que recibe cursor y ejecuta la operación
-            operation_name: Nombre de la operación para logging
-            needs_commit: Si la operación requiere commit (INSERT, UPDATE, DELETE)
+            id: ID del libro a buscar
             
         Returns:
-            Resultado de la operación
+            Libro o None si no existe
         """
-        conn = None
-        try:
-            conn = self.db_pool.get_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            result = operation(cursor)
+        def operation(cursor):
+            self._execute_prepared(cursor, "libro_get_by_id", (id,))
+            row = cursor.fetchone()
             
-            if needs_commit:
-                conn.commit()
+            if row:
+                return Libro.from_db_row(row)
+            return None
+        
+        return self._cached(
+            f"libro:{id}",
+            lambda: self._execute_query(operation, f"obtener libro ID {id}")
+        )
+    
+    
+    def get_by_id_with_autor(self, id: int) -> Optional[Tuple[Libro, Optional[Autor]]]:
+        """
+        Obtiene un libro junto con su autor en una única query (LEFT JOIN).
+        
+        Args:
+            id: ID del libro a buscar
             
-            cursor.close()
-            return result
+        Returns:
+            (Libro, Autor o None), o None si el libro no existe
+        """
+        def operation(cursor):
+            cursor.execute(
+                _LIBRO_CON_AUTOR_SELECT + """
+                FROM libros l
+                LEFT JOIN autores a ON a.id = l.autor_id
+                WHERE l.id = %s
+                """,
+                (id,)
+            )
+            row = cursor.fetchone()
             
-        except Exception as e:
-            if conn and needs_commit:
-                conn.rollback()
-            logger.error(f"Error en {operation_name}: {e}")
-            raise
-        finally:
-            if conn:
-                self.db_pool.release_connection(conn)
-
-
-    def get_by_id(self, id):
-        try:
-            def operation(cursor):
-                cursor.execute("SELECT * FROM libros WHERE id = %s",(id,))
-                row = cursor.fetchone()
-                if row:
-                    return Libro.from_db_row(row)
-        except Exception as e:
-            logger.error("la funcion get ha tenido el siguiente error: %s", e)
-
-
-        return self._execute_query(operation,"Obtener libro por id")
+            if row:
+                return _libro_y_autor_from_row(row)
+            return None
+        
+        return self._execute_query(operation, f"obtener libro ID {id} con su autor")
     
+    def get_by_autor_id_with_autor(self, autor_id: int) -> Optional[Tuple[Autor, List[Libro]]]:
+        """
+        Obtiene un autor junto con todos sus libros en una única query.
+        
+        La query parte de autores (LEFT JOIN libros), así que también devuelve
+        el autor aunque no tenga libros y permite saber si existe sin otra consulta.
+        
+        Args:
+            autor_id: ID del autor
+            
+        Returns:
+            (Autor, lista de libros), o None si el autor no existe
+        """
+        def operation(cursor):
+            cursor.execute(
+                _LIBRO_CON_AUTOR_SELECT + """
+                FROM autores a
+                LEFT JOIN libros l ON l.autor_id = a.id
+                WHERE a.id = %s
+                """,
+                (autor_id,)
+            )
+            rows = cursor.fetchall()
+            
+            if not rows:
+                return None
+            
+            pares = [_libro_y_autor_from_row(row) for row in rows]
+            autor = pares[0][1]
+            return autor, [libro for libro, _ in pares if libro is not None]
+        
+        return self._execute_query(operation, f"obtener libros del autor ID {autor_id} con su autor")
     
     def get_all(self) -> List[Libro]:
         """
@@ -70,12 +178,91 @@ class LibroRepository(BaseRepository[Libro]):
             Lista de libros
         """
         def operation(cursor):
-            cursor.execute("SELECT * FROM libros ORDER BY titulo")
+            cursor.execute("SELECT id, titulo, isbn, anio_publicacion, autor_id FROM libros ORDER BY titulo")
+            rows = cursor.fetchall()
+            
+            return [ Libro.from_db_row(row) for row in rows ]
+        
+        return self._cached(
+            "libros:all",
+            lambda: self._execute_query(operation, "obtener todos los libros")
+        )
+    
+    def iter_all(self, page_size: int = 1000) -> Iterator[Libro]:
+        """
+        Recorre todos los libros con un cursor server-side.
+        
+        Las filas llegan de PostgreSQL en bloques de page_size, por lo que la
+        memoria usada es O(page_size) y no O(filas de la tabla).
+        
+        Args:
+            page_size: Filas que se traen en cada viaje a la BD
+            
+        Yields:
+            Libros ordenados por ID
+        """
+        def operation(conn):
+            with conn.cursor(name="libros_iter") as cursor:
+                cursor.itersize = page_size
+                cursor.execute("SELECT id, titulo, isbn, anio_publicacion, autor_id FROM libros ORDER BY id")
+                for row in cursor:
+                    yield Libro.from_db_row(row)
+        
+        return self._stream_query(operation, "recorrer todos los libros")
+    
+    def iter_all_raw(self, page_size: int = 1000) -> Iterator[dict]:
+        """
+        Como iter_all, pero devuelve cada fila como diccionario sin construir objetos Libro.
+        
+        Pensado para endpoints que solo serializan el resultado a JSON; la
+        lógica de negocio debe seguir usando iter_all.
+        
+        Args:
+            page_size: Filas que se traen en cada viaje a la BD
+            
+        Yields:
+            Diccionarios con las columnas de LIBRO_COLUMNS, ordenados por ID
+        """
+        def operation(conn):
+            with conn.cursor(name="libros_iter_raw") as cursor:
+                cursor.itersize = page_size
+                cursor.execute("SELECT id, titulo, isbn, anio_publicacion, autor_id FROM libros ORDER BY id")
+                columns = LIBRO_COLUMNS
+                for row in cursor:
+                    yield dict(zip(columns, row))
+        
+        return self._stream_query(operation, "recorrer todos los libros (raw)")
+    
+    def get_page(self, limit: int, after_id: Optional[int] = None) -> List[Libro]:
+        """
+        Obtiene una página de libros ordenados por ID (paginación keyset).
+        
+        En lugar de OFFSET se filtra por id > after_id, de modo que PostgreSQL
+        entra directamente por la clave primaria y el coste no crece con la página.
+        
+        Args:
+            limit: Número máximo de libros a devolver
+            after_id: ID del último libro de la página anterior (None para la primera)
+            
+        Returns:
+            Lista de libros de la página
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                SELECT id, titulo, isbn, anio_publicacion, autor_id
+                FROM libros
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+                """,
+                (after_id or 0, limit)
+            )
             rows = cursor.fetchall()
             
             return [ Libro.from_db_row(row) for row in rows ]
         
-        return self._execute_query(operation, "obtener todos los libros")
+        return self._execute_query(operation, f"obtener libros (limit {limit}, after_id {after_id})")
     
     def add(self, entity: Libro) -> Libro:
         """
@@ -88,19 +275,86 @@ class LibroRepository(BaseRepository[Libro]):
             Libro creado con su ID asignado
         """
         def operation(cursor):
-            cursor.execute(
-                """
-                INSERT INTO libros (titulo, isbn, anio_publicacion,autor_id)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id, titulo, isbn, anio_publicacion, autor_id
-                """,
+            self._execute_prepared(
+                cursor, "libro_add",
                 (entity.titulo, entity.isbn, entity.anio_publicacion, entity.autor_id,)
             )
             
             row = cursor.fetchone()
             return Libro.from_db_row(row)
         
-        return self._execute_query(operation, "crear libro", needs_commit=True)
+        libro_creado = self._execute_query(operation, "crear libro", needs_commit=True)
+        self._invalidate("libros:all", f"libros:by_autor:{libro_creado.autor_id}")
+        return libro_creado
+    
+    def add_with_autor(self, entity: Libro) -> Tuple[Libro, Optional[Autor]]:
+        """
+        Crea un nuevo libro y devuelve también su autor, en la misma query.
+        
+        La existencia del autor la comprueba la restricción de clave foránea,
+        sin SELECT previo.
+        
+        Args:
+            entity: Libro a crear
+            
+        Returns:
+            (Libro creado con su ID asignado, Autor del libro)
+            
+        Raises:
+            psycopg2.errors.ForeignKeyViolation: Si el autor_id no existe
+        """
+        def operation(cursor):
+            self._execute_prepared(
+                cursor, "libro_add_with_autor",
+                (entity.titulo, entity.isbn, entity.anio_publicacion, entity.autor_id,)
+            )
+            
+            return _libro_y_autor_from_row(cursor.fetchone())
+        
+        libro_creado, autor = self._execute_query(operation, "crear libro con su autor", needs_commit=True)
+        self._invalidate("libros:all", f"libros:by_autor:{libro_creado.autor_id}")
+        return libro_creado, autor
+    
+    def add_many(self, entities: List[Libro], ignore_conflicts: bool = False) -> List[Libro]:
+        """
+        Crea varios libros en una única sentencia INSERT.
+        
+        Args:
+            entities: Libros a crear
+            ignore_conflicts: Si es True, los libros con un ISBN ya existente
+                se omiten (ON CONFLICT DO NOTHING) en lugar de fallar
+            
+        Returns:
+            Libros creados con su ID asignado, en el mismo orden
+            (sin los omitidos por conflicto)
+        """
+        if not entities:
+            return []
+        
+        on_conflict = "ON CONFLICT (isbn) DO NOTHING" if ignore_conflicts else ""
+        
+        def operation(cursor):
+            rows = psycopg2.extras.execute_values(
+                cursor,
+                f"""
+                INSERT INTO libros (titulo, isbn, anio_publicacion, autor_id)
+                VALUES %s
+                {on_conflict}
+                RETURNING id, titulo, isbn, anio_publicacion, autor_id
+                """,
+                [(e.titulo, e.isbn, e.anio_publicacion, e.autor_id) for e in entities],
+                page_size=500,
+                fetch=True
+            )
+            
+            return [ Libro.from_db_row(row) for row in rows ]
+        
+        libros_creados = self._execute_query(operation, f"crear {len(entities)} libros", needs_commit=True)
+        self._invalidate(
+            "libros:all",
+            *{f"libros:by_autor:{libro.autor_id}" for libro in libros_creados}
+        )
+        return libros_creados
     
     def update(self, entity: Libro) -> Libro:
         """
@@ -111,26 +365,74 @@ class LibroRepository(BaseRepository[Libro]):
             
         Returns:
             Libro actualizado
+            
+        Raises:
+            ValueError: Si el libro no existe
+        """
+        libro_actualizado = self.update_returning(entity)
+        
+        if not libro_actualizado:
+            raise ValueError(f"Libro con ID {entity.id} no encontrado")
+        
+        return libro_actualizado
+    
+    def update_returning(self, entity: Libro) -> Optional[Libro]:
+        """
+        Actualiza un libro y devuelve la fila resultante en el mismo viaje a la BD.
+        
+        La existencia del libro la comprueba el propio UPDATE (sin SELECT previo)
+        y la del autor la restricción de clave foránea.
+        
+        Args:
+            entity: Libro con los datos actualizados
+            
+        Returns:
+            Libro actualizado, o None si no existe ningún libro con ese ID
+            
+        Raises:
+            psycopg2.errors.ForeignKeyViolation: Si el autor_id no existe
+        """
+        result = self.update_with_autor(entity)
+        return result[0] if result else None
+    
+    def update_with_autor(self, entity: Libro) -> Optional[Tuple[Libro, Optional[Autor]]]:
+        """
+        Como update_returning, pero devuelve también el autor del libro en la
+        misma query, sin un SELECT posterior para enriquecer la respuesta.
+        
+        Args:
+            entity: Libro con los datos actualizados
+            
+        Returns:
+            (Libro actualizado, Autor), o None si no existe ningún libro con ese ID
+            
+        Raises:
+            psycopg2.errors.ForeignKeyViolation: Si el autor_id no existe
         """
         def operation(cursor):
-            cursor.execute(
-                """
-                UPDATE libros 
-                SET titulo = %s, isbn = %s, anio_publicacion = %s, autor_id = %s
-                WHERE id = %s
-                RETURNING id, titulo, isbn, anio_publicacion, autor_id
-                """,
-                (entity.titulo, entity.isbn, entity.anio_publicacion, entity.autor_id, entity.id,)
+            self._execute_prepared(
+                cursor, "libro_update_with_autor",
+                (entity.id, entity.titulo, entity.isbn, entity.anio_publicacion, entity.autor_id,)
             )
             
             row = cursor.fetchone()
             
             if not row:
-                raise ValueError(f"Lbro con ID {entity.id} no encontrado")
+                return None
             
-            return Libro.from_db_row(row)
+            return _libro_y_autor_from_row(row), row[9]
+        
+        result = self._execute_query(operation, f"actualizar libro ID {entity.id}", needs_commit=True)
+        
+        if result is None:
+            return None
         
-        return self._execute_query(operation, f"actualizar libro ID {entity.id}", needs_commit=True)
+        (libro_actualizado, autor), autor_id_anterior = result
+        self._invalidate(
+            f"libro:{entity.id}", "libros:all",
+            *{f"libros:by_autor:{autor_id_anterior}", f"libros:by_autor:{libro_actualizado.autor_id}"}
+        )
+        return libro_actualizado, autor
     
     def delete(self, id: int) -> bool:
         """
@@ -143,10 +445,16 @@ class LibroRepository(BaseRepository[Libro]):
             True si se eliminó, False si no existía
         """
         def operation(cursor):
-            cursor.execute("DELETE FROM libros WHERE id = %s", (id,))
-            return cursor.rowcount > 0
+            cursor.execute("DELETE FROM libros WHERE id = %s RETURNING autor_id", (id,))
+            return cursor.fetchone()
         
-        return self._execute_query(operation, f"eliminar libro ID {id}", needs_commit=True)
+        row = self._execute_query(operation, f"eliminar libro ID {id}", needs_commit=True)
+        
+        if not row:
+            return False
+        
+        self._invalidate(f"libro:{id}", "libros:all", f"libros:by_autor:{row[0]}")
+        return True
     
 
     def get_libros_from_autor(self, autor_id) -> List[Libro]:
@@ -159,8 +467,44 @@ class LibroRepository(BaseRepository[Libro]):
             Lista de libros con autor id
         """
         def operation(cursor):
-            cursor.execute("SELECT * FROM libros l WHERE l.autor_id = %s", (autor_id,))
+            cursor.execute("SELECT id, titulo, isbn, anio_publicacion, autor_id FROM libros WHERE autor_id = %s", (autor_id,))
             rows = cursor.fetchall()
             return [Libro.from_db_row(row) for row in rows]
         
-        return self._execute_query(operation, "obtener libros por autor")
\ No newline at end of file
+        return self._cached(
+            f"libros:by_autor:{autor_id}",
+            lambda: self._execute_query(operation, "obtener libros por autor")
+        )
+    
+    def get_libros_by_autor_ids(self, autor_ids: Iterable[int]) -> Dict[int, List[Libro]]:
+        """
+        Obtiene los libros de varios autores en una única query (evita N+1).
+        
+        Reutiliza las entradas libros:by_autor:{id} de la caché y solo consulta
+        la BD para los autores que no estaban cacheados.
+        
+        Args:
+            autor_ids: IDs de los autores
+            
+        Returns:
+            Diccionario {autor_id: lista de libros}, con lista vacía para
+            los autores sin libros
+        """
+        def load(ids: List[int]) -> Dict[int, List[Libro]]:
+            def operation(cursor):
+                cursor.execute(
+                    "SELECT id, titulo, isbn, anio_publicacion, autor_id FROM libros WHERE autor_id = ANY(%s)",
+                    (ids,)
+                )
+                libros_por_autor = {autor_id: [] for autor_id in ids}
+                for row in cursor.fetchall():
+                    libros_por_autor[row[4]].append(Libro.from_db_row(row))
+                return libros_por_autor
+            
+            return self._execute_query(operation, f"obtener libros de {len(ids)} autores")
+        
+        return self._cached_many(set(autor_ids), lambda autor_id: f"libros:by_autor:{autor_id}", load)
+
+
+# Instancia compartida por los servicios: el repositorio no guarda estado por petición
+libro_repository_singleton = LibroRepository()
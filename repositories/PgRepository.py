@@ -0,0 +1,124 @@
+from abc import ABC
+from functools import cached_property
+from typing import Callable, Dict, Iterator, Tuple, TypeVar
+from config.database import DatabasePool
+from repositories.BaseRepository import BaseRepository
+import logging
+
+logger = logging.getLogger(__name__)
+T = TypeVar('T')
+
+
+class PgRepository(BaseRepository[T], ABC):
+    """
+    Repositorio base para PostgreSQL.
+    
+    Implementa el manejo de conexiones común a todos los repositorios
+    concretos, que solo definen sus queries.
+    
+    Patrón Template Method: _execute_query encapsula la lógica común
+    """
+    
+    # Sentencias preparadas del repositorio: nombre -> (tipos de los parámetros, SQL)
+    _prepared_statements: Dict[str, Tuple[str, str]] = {}
+    
+    @cached_property
+    def db_pool(self) -> DatabasePool:
+        """
+        Pool de conexiones, resuelto en el primer uso y guardado en la instancia.
+        
+        Así instanciar el repositorio no abre conexiones (puede hacerse al
+        importar el módulo) y las consultas no repiten el DatabasePool().
+        """
+        return DatabasePool()
+    
+    def _execute_query(self, operation: Callable, operation_name: str, needs_commit: bool = False):
+        """
+        Template Method: Encapsula la lógica común de manejo de conexiones.
+        
+        Args:
+            operation: Función que recibe cursor y ejecuta la operación
+            operation_name: Nombre de la operación para logging
+            needs_commit: Si la operación requiere commit (INSERT, UPDATE, DELETE)
+            
+        Returns:
+            Resultado de la operación
+        """
+        # Dentro de una petición se reutiliza su conexión; fuera (scripts) se pide una al pool
+        conn = self.db_pool.request_connection()
+        request_scoped = conn is not None
+        try:
+            conn = conn or self.db_pool.get_connection()
+            cursor = conn.cursor()
+            
+            result = operation(cursor)
+            
+            if needs_commit:
+                conn.commit()
+            
+            cursor.close()
+            return result
+            
+        except Exception as e:
+            # La conexión de la petición la usan las queries siguientes: una transacción
+            # abortada haría fallar todas con InFailedSqlTransaction, aunque fuera una lectura
+            if conn and not conn.closed and (needs_commit or request_scoped):
+                conn.rollback()
+            logger.error("Error en %s: %s", operation_name, e)
+            raise
+        finally:
+            if conn and not request_scoped:
+                self.db_pool.release_connection(conn)
+
+    def _execute_prepared(self, cursor, name: str, params: tuple) -> None:
+        """
+        Ejecuta una de las sentencias de _prepared_statements como sentencia preparada.
+        
+        Args:
+            cursor: Cursor sobre el que ejecutar
+            name: Nombre de la sentencia
+            params: Valores de los parámetros
+        """
+        types, statement = self._prepared_statements[name]
+        self.db_pool.execute_prepared(cursor, name, types, statement, params)
+
+    def _stream_query(self, operation: Callable, operation_name: str) -> Iterator:
+        """
+        Variante de _execute_query para resultados en streaming.
+        
+        Mantiene la conexión fuera del pool hasta que se agota el generador,
+        ya que los cursores con nombre (server-side) viven en la conexión que los crea.
+        
+        Mientras el cliente consume la respuesta la transacción queda inactiva
+        entre lotes, por lo que se desactiva idle_in_transaction_session_timeout
+        (solo en esta transacción, con SET LOCAL) para que un cliente lento no
+        haga que PostgreSQL cierre la conexión a mitad del streaming.
+        
+        Args:
+            operation: Generador que recibe la conexión y produce los resultados
+            operation_name: Nombre de la operación para logging
+            
+        Yields:
+            Resultados producidos por la operación
+        """
+        conn = self.db_pool.request_connection()
+        request_scoped = conn is not None
+        try:
+            conn = conn or self.db_pool.get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL idle_in_transaction_session_timeout = 0")
+            
+            yield from operation(conn)
+            
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL idle_in_transaction_session_timeout = DEFAULT")
+            
+        except Exception as e:
+            # Igual que en _execute_query: no dejar abortada la transacción de la petición
+            if conn and not conn.closed and request_scoped:
+                conn.rollback()
+            logger.error("Error en %s: %s", operation_name, e)
+            raise
+        finally:
+            if conn and not request_scoped:
+                self.db_pool.release_connection(conn)
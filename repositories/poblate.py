@@ -1,23 +1,42 @@
-from repositories.AutorRepository import AutorRepository
-from repositories.LibroRepository import LibroRepository
+"""
+Carga datos de ejemplo en la base de datos.
+
+Uso: python -m repositories.poblate
+
+Es idempotente: los autores ya existentes (por nombre) se reutilizan y los
+libros cuyo ISBN ya existe se omiten.
+"""
+from repositories.AutorRepository import autor_repository_singleton as autor_repo
+from repositories.LibroRepository import libro_repository_singleton as libro_repo
 from models.Autor import Autor
 from models.Libro import Libro
 from datetime import date
 
-# Instanciar repositorios
-autor_repo = AutorRepository()
-libro_repo = LibroRepository()
 
-# 1. Crear un autor
-nuevo_autor = Autor(id=None, nombre="Gabriel García Márquez", nacionalidad="Colombiana", fecha_nacimiento=date(1927, 3, 6))
-autor_creado = autor_repo.add(nuevo_autor)
-print("Autor creado:", autor_creado)
+def seed():
+    """Crea los autores y libros de ejemplo que todavía no existan."""
+    # 1. Crear en un único INSERT los autores que aún no existen
+    nuevos_autores = [
+        Autor(id=None, nombre="Gabriel García Márquez", nacionalidad="Colombiana", fecha_nacimiento=date(1927, 3, 6)),
+    ]
+    existentes = {autor.nombre: autor for autor in autor_repo.get_all()}
+    autores_creados = autor_repo.add_many([a for a in nuevos_autores if a.nombre not in existentes])
+    print("Autores creados:", autores_creados)
+
+    autores = {**existentes, **{autor.nombre: autor for autor in autores_creados}}
+    autor = autores["Gabriel García Márquez"]
+
+    # 2. Crear los libros asociados al autor en un único INSERT, omitiendo ISBN repetidos
+    nuevos_libros = [
+        Libro(id=None, titulo="Cien años de soledad", isbn="9783161484100", anio_publicacion=1967, autor_id=autor.id),
+    ]
+    libros_creados = libro_repo.add_many(nuevos_libros, ignore_conflicts=True)
+    print("Libros creados:", libros_creados)
+
+    # 3. Consultar los libros de ese autor
+    libros_autor = libro_repo.get_libros_from_autor(autor.id)
+    print("Libros del autor:", libros_autor)
 
-# 2. Crear un libro asociado al autor
-nuevo_libro = Libro(id=None, titulo="Cien años de soledad", isbn="9783161484100", anio_publicacion=1967, autor_id=1)
-libro_creado = libro_repo.add(nuevo_libro)
-print("Libro creado:", libro_creado)
 
-# 3. Consultar los libros de ese autor
-libros_autor = libro_repo.get_libros_from_autor(1)
-print("Libros del autor:", libros_autor)
+if __name__ == "__main__":
+    seed()
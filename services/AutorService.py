@@ -1,10 +1,22 @@
-from typing import List, Optional
-from repositories.AutorRepository import AutorRepository
+from typing import BinaryIO, Iterator, List, Optional
+from repositories.AutorRepository import AutorRepository, autor_repository_singleton
+from repositories.LibroRepository import LibroRepository, libro_repository_singleton
 from models.Autor import Autor
+from datetime import date
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Tamaño máximo de página permitido en los listados paginados
+MAX_PAGE_SIZE = 1000
+
+# Formato YYYY-MM-DD; la validez de la fecha la comprueba después date.fromisoformat
+_FECHA_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Campos obligatorios de un autor, en el orden en que se informa el primero que falte
+_CAMPOS_REQUERIDOS = ("nombre", "nacionalidad", "fecha_nacimiento")
+
 class AutorService:
     """
     Servicio de lógica de negocio para Autores.
@@ -21,14 +33,18 @@ class AutorService:
     - OCP: Extensible sin modificar AutorRepository
     """
     
-    def __init__(self, autor_repository: AutorRepository = None):
+    def __init__(self,
+                 autor_repository: AutorRepository = None,
+                 libro_repository: LibroRepository = None):
         """
         Inicializa el servicio con inyección de dependencias.
         
         Args:
             autor_repository: Repositorio de autores (opcional para testing)
+            libro_repository: Repositorio de libros (opcional para testing)
         """
-        self.autor_repo = autor_repository or AutorRepository()
+        self.autor_repo = autor_repository or autor_repository_singleton
+        self.libro_repo = libro_repository or libro_repository_singleton
     
     def crear_autor(self, datos: dict) -> Autor:
         """
@@ -52,7 +68,7 @@ class AutorService:
         # Persistir
         autor_creado = self.autor_repo.add(autor)
         
-        logger.info(f"Autor creado: {autor_creado.nombre} (ID: {autor_creado.id})")
+        logger.info("Autor creado: %s (ID: %s)", autor_creado.nombre, autor_creado.id)
         return autor_creado
     
     def obtener_autor_por_id(self, id: int) -> Optional[Autor]:
@@ -74,7 +90,7 @@ class AutorService:
         autor = self.autor_repo.get_by_id(id)
         
         if not autor:
-            logger.warning(f"Autor con ID {id} no encontrado")
+            logger.warning("Autor con ID %s no encontrado", id)
         
         return autor
     
@@ -86,7 +102,71 @@ class AutorService:
             Lista de autores
         """
         autores = self.autor_repo.get_all()
-        logger.info(f"Obtenidos {len(autores)} autores")
+        logger.info("Obtenidos %d autores", len(autores))
+        return autores
+    
+    def obtener_autores_con_libros(self) -> List[dict]:
+        """
+        Obtiene todos los autores con sus libros anidados.
+        
+        Los libros de todos los autores se cargan en una única query en lugar
+        de una por autor.
+        
+        Returns:
+            Lista de diccionarios con autor + lista de libros
+        """
+        autores = self.autor_repo.get_all()
+        libros_por_autor = self.libro_repo.get_libros_by_autor_ids(autor.id for autor in autores)
+        
+        logger.info("Obtenidos %d autores con sus libros", len(autores))
+        return [
+            {
+                **autor.to_dict(),
+                "libros": [libro.to_dict() for libro in libros_por_autor.get(autor.id, [])]
+            }
+            for autor in autores
+        ]
+    
+    def iterar_autores(self) -> Iterator[Autor]:
+        """
+        Recorre todos los autores en streaming, sin cargarlos todos en memoria.
+        
+        Returns:
+            Iterador de autores ordenados por ID
+        """
+        return self.autor_repo.iter_all()
+    
+    def exportar_autores_csv(self, out_stream: BinaryIO) -> None:
+        """
+        Exporta todos los autores en formato CSV.
+        
+        Args:
+            out_stream: Fichero binario donde se escribe el CSV
+        """
+        self.autor_repo.export_csv(out_stream)
+        logger.info("Autores exportados a CSV")
+    
+    def obtener_autores_paginados(self, limit: int, offset: int = 0) -> List[Autor]:
+        """
+        Obtiene una página de autores.
+        
+        Args:
+            limit: Número de autores por página (1..MAX_PAGE_SIZE)
+            offset: Número de autores a saltar
+            
+        Returns:
+            Lista de autores de la página
+            
+        Raises:
+            ValueError: Si limit u offset no son válidos
+        """
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"El límite debe estar entre 1 y {MAX_PAGE_SIZE}")
+        if offset < 0:
+            raise ValueError("El offset no puede ser negativo")
+        
+        autores = self.autor_repo.get_page(limit, offset)
+        logger.info("Obtenidos %d autores (offset %d)", len(autores), offset)
         return autores
     
     def actualizar_autor(self, id: int, datos: dict) -> Autor:
@@ -122,7 +202,7 @@ class AutorService:
         # Persistir
         autor_actualizado = self.autor_repo.update(autor)
         
-        logger.info(f"Autor actualizado: {autor_actualizado.nombre} (ID: {id})")
+        logger.info("Autor actualizado: %s (ID: %s)", autor_actualizado.nombre, id)
         return autor_actualizado
     
     def eliminar_autor(self, id: int) -> bool:
@@ -144,9 +224,9 @@ class AutorService:
         eliminado = self.autor_repo.delete(id)
         
         if eliminado:
-            logger.info(f"Autor con ID {id} eliminado")
+            logger.info("Autor con ID %s eliminado", id)
         else:
-            logger.warning(f"Autor con ID {id} no encontrado para eliminar")
+            logger.warning("Autor con ID %s no encontrado para eliminar", id)
         
         return eliminado
     
@@ -160,18 +240,18 @@ class AutorService:
         Raises:
             ValueError: Si alguna validación falla
         """
-        # Validar campos requeridos
-        campos_requeridos = ['nombre', 'nacionalidad', 'fecha_nacimiento']
-        for campo in campos_requeridos:
-            if campo not in datos or not datos[campo]:
-                raise ValueError(f"El campo '{campo}' es requerido")
+        # Validar campos requeridos (ausentes o vacíos)
+        faltante = next((campo for campo in _CAMPOS_REQUERIDOS if not datos.get(campo)), None)
+        if faltante:
+            raise ValueError(f"El campo '{faltante}' es requerido")
         
         # Validar nombre (al menos 2 caracteres, solo letras y espacios)
         nombre = datos['nombre'].strip()
         if len(nombre) < 2:
             raise ValueError("El nombre debe tener al menos 2 caracteres")
         
-        if not all(c.isalpha() or c.isspace() for c in nombre):
+        # Sin los espacios, isalpha() comprueba en C que el resto sean letras
+        if not "".join(nombre.split()).isalpha():
             raise ValueError("El nombre solo puede contener letras y espacios")
         
         # Validar nacionalidad (al menos 2 caracteres)
@@ -194,9 +274,10 @@ class AutorService:
         Returns:
             True si es válida
         """
+        if not _FECHA_RE.fullmatch(fecha):
+            return False
         try:
-            from datetime import datetime
-            datetime.strptime(fecha, '%Y-%m-%d')
+            date.fromisoformat(fecha)
             return True
         except ValueError:
             return False
\ No newline at end of file
@@ -1,11 +1,56 @@
-from typing import List, Optional
-from repositories.LibroRepository import LibroRepository
-from repositories.AutorRepository import AutorRepository
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from repositories.LibroRepository import LIBRO_COLUMNS, LibroRepository, libro_repository_singleton
+from repositories.AutorRepository import AutorRepository, autor_repository_singleton
 from models.Libro import Libro
+from psycopg2 import errors
+from pydantic import BaseModel, ValidationError, conint, constr
 import logging
 
 logger = logging.getLogger(__name__)
 
+MAX_PAGE_SIZE = 1000
+
+# Libros enriquecidos compartidos entre peticiones (LRU, thread-safe)
+ENRICHED_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=ENRICHED_CACHE_SIZE)
+def _libro_enriquecido(libro_campos: tuple, autor_items: Optional[tuple]) -> dict:
+    """
+    Construye el dict de un libro con su autor anidado, memorizado por contenido.
+    
+    La clave son los propios valores del libro y del autor: un libro o autor
+    modificado genera otra clave, así que nunca se sirve un dict desactualizado
+    y no hace falta invalidar.
+    
+    Args:
+        libro_campos: Valores del libro en el orden de LIBRO_COLUMNS
+        autor_items: items() del autor serializado, o None si no tiene
+        
+    Returns:
+        Diccionario compartido: debe tratarse como de solo lectura
+    """
+    libro_dict = dict(zip(LIBRO_COLUMNS, libro_campos))
+    libro_dict['autor'] = dict(autor_items) if autor_items is not None else None
+    return libro_dict
+
+
+class LibroIn(BaseModel):
+    """
+    Esquema de entrada de un libro.
+    
+    Se compila una sola vez al importar el módulo; la coerción de tipos y las
+    comprobaciones de rango las hace pydantic-core en lugar de código Python.
+    """
+    titulo: constr(strip_whitespace=True, min_length=1)
+    isbn: constr(strip_whitespace=True, min_length=1, max_length=13)
+    # Columna nullable: el año es opcional, pero si se indica debe estar en rango
+    anio_publicacion: Optional[conint(ge=1000, le=2100)] = None
+    autor_id: conint(gt=0)
+
+
 class LibroService:
     """
     Servicio de lógica de negocio para Libros.
@@ -32,8 +77,8 @@ class LibroService:
             libro_repository: Repositorio de libros (opcional para testing)
             autor_repository: Repositorio de autores (opcional para testing)
         """
-        self.libro_repo = libro_repository or LibroRepository()
-        self.autor_repo = autor_repository or AutorRepository()
+        self.libro_repo = libro_repository or libro_repository_singleton
+        self.autor_repo = autor_repository or autor_repository_singleton
     
     def crear_libro(self, datos: dict) -> dict:
         """
@@ -44,7 +89,7 @@ class LibroService:
         - El autor exista en la BD
         
         Args:
-            datos: Diccionario con {titulo, autor_id, año_publicacion, genero}
+            datos: Diccionario con {titulo, isbn, anio_publicacion, autor_id}
             
         Returns:
             Diccionario con el libro creado + información del autor
@@ -53,22 +98,18 @@ class LibroService:
             ValueError: Si los datos no son válidos o el autor no existe
         """
         # Validar datos básicos
-        self._validar_datos_libro(datos)
-        
-        # Validar que el autor existe (regla de negocio crítica)
-        autor_id = datos['autor_id']
-        autor = self.autor_repo.get_by_id(autor_id)
-        
-        if not autor:
-            raise ValueError(f"El autor con ID {autor_id} no existe")
+        datos = self._validar_datos_libro(datos)
         
         # Crear entidad libro
         libro = Libro.from_dict(datos)
         
-        # Persistir
-        libro_creado = self.libro_repo.add(libro)
+        # Persistir: la FK comprueba que el autor existe y el autor vuelve en la misma query
+        try:
+            libro_creado, autor = self.libro_repo.add_with_autor(libro)
+        except errors.ForeignKeyViolation as e:
+            raise ValueError(f"El autor con ID {datos['autor_id']} no existe") from e
         
-        logger.info(f"Libro creado: '{libro_creado.titulo}' (ID: {libro_creado.id}) del autor {autor.nombre}")
+        logger.info("Libro creado: '%s' (ID: %d) del autor %s", libro_creado.titulo, libro_creado.id, autor.nombre)
         
         # Retornar con información del autor incluida
         return self._enriquecer_libro_con_autor(libro_creado, autor)
@@ -89,28 +130,87 @@ class LibroService:
         if id <= 0:
             raise ValueError("El ID debe ser un número positivo")
         
-        libro = self.libro_repo.get_by_id(id)
+        # Libro y autor en un único viaje a la BD (JOIN)
+        resultado = self.libro_repo.get_by_id_with_autor(id)
         
-        if not libro:
-            logger.warning(f"Libro con ID {id} no encontrado")
+        if not resultado:
+            logger.warning("Libro con ID %d no encontrado", id)
             return None
         
-        # Obtener información del autor
-        autor = self.autor_repo.get_by_id(libro.autor_id)
+        libro, autor = resultado
         
         return self._enriquecer_libro_con_autor(libro, autor)
     
-    def obtener_todos_libros(self) -> List[dict]:
+    def obtener_todos_libros(self, page_size: int = 50,
+                             after_id: Optional[int] = None) -> Tuple[List[dict], Optional[int]]:
         """
-        Obtiene todos los libros con información de sus autores.
+        Obtiene una página de libros con información de sus autores.
         
+        Usa paginación keyset: cada página empieza después del último ID de la
+        anterior, así que la memoria por petición es O(page_size) y no O(tabla).
+        
+        Args:
+            page_size: Número de libros por página (1..MAX_PAGE_SIZE)
+            after_id: ID devuelto como next_cursor por la página anterior
+            
         Returns:
-            Lista de diccionarios con libros + autores
+            (lista de libros + autores, next_cursor); next_cursor es None en la última página
+            
+        Raises:
+            ValueError: Si page_size o after_id no son válidos
         """
-        libros = self.libro_repo.get_all()
+        if page_size < 1 or page_size > MAX_PAGE_SIZE:
+            raise ValueError(f"El tamaño de página debe estar entre 1 y {MAX_PAGE_SIZE}")
+        if after_id is not None and after_id < 0:
+            raise ValueError("El cursor no puede ser negativo")
+        
+        # Se pide una fila de más: si llega, hay otra página detrás. No se usa COUNT(*) OVER():
+        # la ventana se calcula antes del LIMIT y obligaría a leer todas las filas restantes
+        libros = self.libro_repo.get_page(page_size + 1, after_id)
+        hay_mas = len(libros) > page_size
+        del libros[page_size:]
+        
+        autor_dicts_by_id = self._get_autor_dicts([libro.autor_id for libro in libros])
+        
+        # Métodos ligados a nombres locales: evita resolver el atributo en cada iteración
+        enriquecer = self._enriquecer_libro_con_autor
+        autor_dict_de = autor_dicts_by_id.get
+        libros_enriquecidos = [
+            enriquecer(libro, autor_dict=autor_dict_de(libro.autor_id))
+            for libro in libros
+        ]
+        
+        next_cursor = libros[-1].id if hay_mas else None
         
-        logger.info(f"Obtenidos {len(libros)} libros")
-        return libros
+        logger.info("Obtenidos %d libros", len(libros))
+        return libros_enriquecidos, next_cursor
+    
+    def iterar_libros(self, lote: int = 1000) -> Iterator[dict]:
+        """
+        Recorre todos los libros con información de sus autores, en streaming.
+        
+        Las filas llegan de un cursor server-side como diccionarios, sin
+        construir objetos Libro, y se enriquecen por lotes (una query de autores
+        por lote), así que la memoria usada es O(lote) y no O(filas de la tabla).
+        
+        Args:
+            lote: Libros que se leen y enriquecen de cada vez
+            
+        Yields:
+            Diccionarios con libro + autor, ordenados por ID
+        """
+        libros = self.libro_repo.iter_all_raw(page_size=lote)
+        
+        while True:
+            bloque = list(islice(libros, lote))
+            if not bloque:
+                return
+            
+            # Autores solo de este lote: nada se retiene entre lotes
+            autor_dict_de = self._get_autor_dicts([libro['autor_id'] for libro in bloque]).get
+            for libro in bloque:
+                libro['autor'] = autor_dict_de(libro['autor_id'])
+                yield libro
     
     def obtener_libros_por_autor(self, autor_id: int) -> List[dict]:
         """
@@ -125,22 +225,19 @@ class LibroService:
         Raises:
             ValueError: Si el autor no existe
         """
-        # Validar que el autor existe
-        autor = self.autor_repo.get_by_id(autor_id)
+        # Autor y sus libros en un único viaje a la BD; None indica que el autor no existe
+        resultado = self.libro_repo.get_by_autor_id_with_autor(autor_id)
         
-        if not autor:
+        if not resultado:
             raise ValueError(f"El autor con ID {autor_id} no existe")
         
-        # Obtener libros del autor
-        libros = self.libro_repo.get_by_autor_id(autor_id)
+        autor, libros = resultado
         
-        # Enriquecer con información del autor
-        libros_enriquecidos = [
-            self._enriquecer_libro_con_autor(libro, autor)
-            for libro in libros
-        ]
+        # Enriquecer con información del autor: todos comparten el mismo, se serializa una vez
+        enriquecer = partial(self._enriquecer_libro_con_autor, autor_dict=autor.to_dict())
+        libros_enriquecidos = list(map(enriquecer, libros))
         
-        logger.info(f"Obtenidos {len(libros)} libros del autor {autor.nombre}")
+        logger.info("Obtenidos %d libros del autor %s", len(libros), autor.nombre)
         return libros_enriquecidos
     
     def actualizar_libro(self, id: int, datos: dict) -> dict:
@@ -157,32 +254,25 @@ class LibroService:
         Raises:
             ValueError: Si los datos no son válidos o el libro/autor no existe
         """
-        # Validar que el libro existe
-        libro_existente = self.libro_repo.get_by_id(id)
-        if not libro_existente:
-            raise ValueError(f"Libro con ID {id} no encontrado")
-        
         # Validar datos
-        self._validar_datos_libro(datos)
+        datos = self._validar_datos_libro(datos)
+        
+        # Crear entidad actualizada por el mismo camino que crear_libro
+        libro = Libro.from_dict({**datos, 'id': id})
         
-        # Validar que el nuevo autor existe
-        autor = self.autor_repo.get_by_id(datos['autor_id'])
-        if not autor:
-            raise ValueError(f"El autor con ID {datos['autor_id']} no existe")
+        # Persistir: el UPDATE comprueba que el libro existe y la FK que existe el autor;
+        # el autor para enriquecer la respuesta vuelve en la misma query
+        try:
+            resultado = self.libro_repo.update_with_autor(libro)
+        except errors.ForeignKeyViolation as e:
+            raise ValueError(f"El autor con ID {datos['autor_id']} no existe") from e
         
-        # Crear entidad actualizada
-        libro = Libro(
-            id=id,
-            titulo=datos['titulo'],
-            autor_id=datos['autor_id'],
-            año_publicacion=datos['año_publicacion'],
-            genero=datos['genero']
-        )
+        if not resultado:
+            raise ValueError(f"Libro con ID {id} no encontrado")
         
-        # Persistir
-        libro_actualizado = self.libro_repo.update(libro)
+        libro_actualizado, autor = resultado
         
-        logger.info(f"Libro actualizado: '{libro_actualizado.titulo}' (ID: {id})")
+        logger.info("Libro actualizado: '%s' (ID: %d)", libro_actualizado.titulo, id)
         
         return self._enriquecer_libro_con_autor(libro_actualizado, autor)
     
@@ -205,68 +295,73 @@ class LibroService:
         eliminado = self.libro_repo.delete(id)
         
         if eliminado:
-            logger.info(f"Libro con ID {id} eliminado")
+            logger.info("Libro con ID %d eliminado", id)
         else:
-            logger.warning(f"Libro con ID {id} no encontrado para eliminar")
+            logger.warning("Libro con ID %d no encontrado para eliminar", id)
         
         return eliminado
     
-    def _validar_datos_libro(self, datos: dict) -> None:
+    def _validar_datos_libro(self, datos: dict) -> dict:
         """
         Valida los datos de un libro según reglas de negocio.
         
         Args:
             datos: Diccionario con los datos del libro
             
+        Returns:
+            Diccionario normalizado (tipos convertidos y textos sin espacios sobrantes)
+            
         Raises:
             ValueError: Si alguna validación falla
         """
-        # Validar campos requeridos
-        campos_requeridos = ['titulo', 'autor_id', 'año_publicacion', 'genero']
-        for campo in campos_requeridos:
-            if campo not in datos or datos[campo] is None:
-                raise ValueError(f"El campo '{campo}' es requerido")
-        
-        # Validar título
-        titulo = str(datos['titulo']).strip()
-        if len(titulo) < 1:
-            raise ValueError("El título no puede estar vacío")
-        
-        # Validar autor_id
         try:
-            autor_id = int(datos['autor_id'])
-            if autor_id <= 0:
-                raise ValueError("El ID del autor debe ser positivo")
-        except (ValueError, TypeError):
-            raise ValueError("El ID del autor debe ser un número válido")
+            return LibroIn.model_validate(datos).model_dump()
+        except ValidationError as e:
+            error = e.errors()[0]
+            campo = error['loc'][0] if error['loc'] else 'datos'
+            if error['type'] == 'missing':
+                raise ValueError(f"El campo '{campo}' es requerido") from None
+            raise ValueError(f"El campo '{campo}' no es válido: {error['msg']}") from None
+    
+    def _get_autor_dicts(self, autor_ids: Iterable[Optional[int]]) -> Dict[int, dict]:
+        """
+        Obtiene ya serializados los autores de un lote de libros.
         
-        # Validar año de publicación
-        try:
-            año = int(datos['año_publicacion'])
-            if año < 1000 or año > 2100:
-                raise ValueError("El año de publicación debe estar entre 1000 y 2100")
-        except (ValueError, TypeError):
-            raise ValueError("El año de publicación debe ser un número válido")
-        
-        # Validar género
-        genero = str(datos['genero']).strip()
-        if len(genero) < 2:
-            raise ValueError("El género debe tener al menos 2 caracteres")
+        Un único SELECT ... WHERE id = ANY(...) para todos los autores, en lugar
+        de uno por libro; cada autor se serializa una sola vez y su dict se
+        comparte entre todos sus libros. No se memoriza nada entre llamadas.
+        
+        Args:
+            autor_ids: autor_id de cada libro (se admiten repetidos y None)
+            
+        Returns:
+            Diccionario {id: autor.to_dict()} con los autores que existen
+        """
+        ids = {autor_id for autor_id in autor_ids if autor_id is not None}
+        if not ids:
+            return {}
+        
+        autores_by_id = self.autor_repo.get_by_ids(ids)
+        return {autor_id: autor.to_dict() for autor_id, autor in autores_by_id.items()}
     
-    def _enriquecer_libro_con_autor(self, libro: Libro, autor) -> dict:
+    def _enriquecer_libro_con_autor(self, libro: Libro, autor=None, autor_dict: Optional[dict] = None) -> dict:
         """
         Combina la información del libro con la del autor.
         
         Args:
             libro: Entidad Libro
             autor: Entidad Autor (puede ser None)
+            autor_dict: Autor ya serializado; si se indica se usa en lugar de
+                autor.to_dict() (útil cuando varios libros comparten autor)
             
         Returns:
-            Diccionario con libro + autor anidado
+            Diccionario con libro + autor anidado (compartido entre peticiones,
+            de solo lectura; ver _libro_enriquecido)
         """
-        libro_dict = libro.to_dict()
-        
-        # Añadir información del autor
-        libro_dict['autor'] = autor.to_dict() if autor else None
+        if autor_dict is None and autor:
+            autor_dict = autor.to_dict()
         
-        return libro_dict
\ No newline at end of file
+        return _libro_enriquecido(
+            (libro.id, libro.titulo, libro.isbn, libro.anio_publicacion, libro.autor_id),
+            tuple(autor_dict.items()) if autor_dict is not None else None
+        )
\ No newline at end of file
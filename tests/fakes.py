@@ -0,0 +1,164 @@
+"""
+Dobles de prueba para los repositorios: conexión y pool de PostgreSQL y cliente Redis en memoria.
+
+Permiten ejecutar los repositorios sin base de datos ni Redis, comprobando las
+sentencias que envían y los datos que guardan en caché.
+"""
+from typing import Any, Dict, List, Optional
+import orjson
+from config.cache import RedisCache
+
+# Sentencias que producen filas y consumen un resultado del guion de FakeConnection
+_CON_RESULTADO = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "EXECUTE")
+
+
+class Result:
+    """Resultado de una sentencia: filas y, opcionalmente, rowcount."""
+
+    def __init__(self, rows=(), rowcount: Optional[int] = None):
+        self.rows = list(rows)
+        self.rowcount = len(self.rows) if rowcount is None else rowcount
+
+
+class FakeCursor:
+    """Cursor que registra cada sentencia y devuelve los resultados del guion de su conexión."""
+
+    def __init__(self, connection: "FakeConnection", name: Optional[str] = None):
+        self.connection = connection
+        self.name = name
+        self.itersize = None
+        self.rowcount = -1
+        self._rows: List[tuple] = []
+
+    def execute(self, sql: str, params=None) -> None:
+        self.connection.executed.append((" ".join(sql.split()), params))
+        if sql.lstrip().upper().startswith(_CON_RESULTADO):
+            result = self.connection.results.pop(0)
+            self._rows = list(result.rows)
+            self.rowcount = result.rowcount
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def __iter__(self):
+        while self._rows:
+            yield self._rows.pop(0)
+
+    def copy_expert(self, sql: str, out_stream) -> None:
+        self.connection.executed.append((" ".join(sql.split()), None))
+        out_stream.write(self.connection.copy_data)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    """
+    Conexión con un guion de resultados: cada sentencia que devuelve filas
+    consume el siguiente Result de results, en orden.
+    """
+
+    def __init__(self, results=(), copy_data: bytes = b""):
+        self.results: List[Result] = [r if isinstance(r, Result) else Result(r) for r in results]
+        self.copy_data = copy_data
+        self.executed: List[tuple] = []
+        self.cursor_names: List[Optional[str]] = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = 0
+
+    def cursor(self, name: Optional[str] = None) -> FakeCursor:
+        self.cursor_names.append(name)
+        return FakeCursor(self, name)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    @property
+    def statements(self) -> List[str]:
+        """SQL ejecutado, sin parámetros."""
+        return [sql for sql, _ in self.executed]
+
+
+class FakePool:
+    """Sustituye a DatabasePool: siempre entrega la misma conexión, fuera de una petición de Flask."""
+
+    def __init__(self, connection: FakeConnection):
+        self.connection = connection
+        self.released = 0
+
+    def request_connection(self):
+        return None
+
+    def get_connection(self) -> FakeConnection:
+        return self.connection
+
+    def release_connection(self, connection) -> None:
+        self.released += 1
+
+    def execute_prepared(self, cursor, name: str, types: str, statement: str, params: tuple) -> None:
+        cursor.execute(f"EXECUTE {name}", params)
+
+
+class FakeRedis:
+    """Cliente Redis en memoria con las operaciones que usa RedisCache (sin TTL real)."""
+
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        assert isinstance(value, bytes)
+        self.data[key] = value
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        return self
+
+    def execute(self) -> None:
+        pass
+
+    def json(self, key: str) -> Any:
+        """Contenido decodificado de una clave, para las aserciones."""
+        return orjson.loads(self.data[key])
+
+
+def fake_cache(client: FakeRedis, ttl: int = 300) -> RedisCache:
+    """Crea un RedisCache sobre FakeRedis, sin pasar por el singleton ni por la configuración."""
+    cache = object.__new__(RedisCache)
+    cache._client = client
+    cache.ttl = ttl
+    return cache
+
+
+def make_repository(cls, connection: FakeConnection, redis: Optional[FakeRedis] = None):
+    """
+    Instancia un repositorio conectado a los dobles.
+    
+    Sin redis, la caché queda desactivada (RedisCache sin cliente).
+    """
+    repository = cls()
+    repository.db_pool = FakePool(connection)
+    repository.cache = fake_cache(redis) if redis is not None else fake_cache(None)
+    return repository
@@ -0,0 +1,131 @@
+import unittest
+from datetime import date
+from models.Autor import Autor
+from models.Libro import Libro
+from repositories.AutorRepository import AutorRepository
+from repositories.LibroRepository import LibroRepository
+from tests.fakes import FakeConnection, FakeRedis, Result, make_repository
+
+AUTOR_ROW = (1, "Isabel Allende", "Chilena", date(1942, 8, 2))
+LIBRO_ROW = (7, "La casa de los espíritus", "9788497592208", 1982, 1)
+
+
+class CacheRoundTripTest(unittest.TestCase):
+    """Las entidades se guardan en Redis como JSON (to_dict) y se reconstruyen al leer."""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+
+    def _autor_repository(self, connection):
+        repository = make_repository(AutorRepository, connection, self.redis)
+        repository._local_cache = None  # aislar la capa Redis
+        return repository
+
+    def test_autor_se_guarda_como_json_y_se_reconstruye(self):
+        connection = FakeConnection([[AUTOR_ROW]])
+        repository = self._autor_repository(connection)
+
+        primero = repository.get_by_id(1)
+        segundo = repository.get_by_id(1)
+
+        self.assertEqual(self.redis.json("autor:1"), {
+            "id": 1, "nombre": "Isabel Allende", "nacionalidad": "Chilena", "fecha_nacimiento": "1942-08-02"
+        })
+        self.assertEqual(len(connection.executed), 1, "la segunda lectura debe salir de la caché")
+        self.assertIsInstance(segundo, Autor)
+        self.assertEqual(segundo.to_dict(), primero.to_dict())
+        self.assertEqual(segundo.fecha_nacimiento, date(1942, 8, 2))
+
+    def test_lista_de_libros_se_reconstruye(self):
+        connection = FakeConnection([[LIBRO_ROW, (8, "Paula", "9788401341915", None, 1)]])
+        repository = make_repository(LibroRepository, connection, self.redis)
+
+        repository.get_libros_from_autor(1)
+        libros = repository.get_libros_from_autor(1)
+
+        self.assertEqual(len(connection.executed), 1)
+        self.assertTrue(all(isinstance(libro, Libro) for libro in libros))
+        self.assertEqual([libro.to_dict() for libro in libros], self.redis.json("libros:by_autor:1"))
+        self.assertIsNone(libros[1].anio_publicacion)
+
+    def test_inexistente_no_se_cachea(self):
+        connection = FakeConnection([[], []])
+        repository = self._autor_repository(connection)
+
+        self.assertIsNone(repository.get_by_id(99))
+        self.assertIsNone(repository.get_by_id(99))
+        self.assertEqual(len(connection.executed), 2)
+        self.assertNotIn("autor:99", self.redis.data)
+
+    def test_get_by_ids_solo_consulta_los_no_cacheados(self):
+        connection = FakeConnection([[AUTOR_ROW], [(2, "Julio Cortázar", "Argentino", date(1914, 8, 26))]])
+        repository = self._autor_repository(connection)
+        repository.get_by_id(1)
+
+        autores = repository.get_by_ids([1, 2])
+
+        self.assertEqual(sorted(autores), [1, 2])
+        sql, params = connection.executed[-1]
+        self.assertIn("ANY", sql)
+        self.assertEqual(params, ([2],))
+        self.assertIn("autor:2", self.redis.data)
+
+
+class CacheInvalidationTest(unittest.TestCase):
+    """Las escrituras eliminan de Redis (y de la caché local) las claves afectadas."""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+
+    def test_update_de_autor_invalida_sus_claves(self):
+        connection = FakeConnection([[AUTOR_ROW], [AUTOR_ROW], [(1, "Isabel A.", "Chilena", date(1942, 8, 2))]])
+        repository = make_repository(AutorRepository, connection, self.redis)
+        repository.get_by_id(1)
+        repository.get_all()
+
+        repository.update(Autor(id=1, nombre="Isabel A.", nacionalidad="Chilena", fecha_nacimiento=date(1942, 8, 2)))
+
+        self.assertNotIn("autor:1", self.redis.data)
+        self.assertNotIn("autores:all", self.redis.data)
+        if repository._local_cache is not None:
+            self.assertNotIn(1, repository._local_cache)
+
+    def test_delete_de_autor_invalida_tambien_sus_libros(self):
+        connection = FakeConnection([[(10,), (11,)], Result(rowcount=1)])
+        repository = make_repository(AutorRepository, connection, self.redis)
+        for key in ("autor:1", "autores:all", "libros:by_autor:1", "libros:all", "libro:10", "libro:11", "libro:12"):
+            self.redis.data[key] = b"{}"
+
+        self.assertTrue(repository.delete(1))
+
+        self.assertEqual(list(self.redis.data), ["libro:12"])
+        self.assertEqual(connection.commits, 1)
+
+    def test_delete_de_libro_invalida_la_lista_de_su_autor(self):
+        connection = FakeConnection([[(3,)]])
+        repository = make_repository(LibroRepository, connection, self.redis)
+        for key in ("libro:7", "libros:all", "libros:by_autor:3", "libros:by_autor:4"):
+            self.redis.data[key] = b"{}"
+
+        self.assertTrue(repository.delete(7))
+
+        self.assertEqual(list(self.redis.data), ["libros:by_autor:4"])
+
+    def test_update_de_libro_invalida_el_autor_anterior_y_el_nuevo(self):
+        # libro_update_with_autor: libro (0-4), autor (5-8), autor_id anterior (9)
+        connection = FakeConnection([[LIBRO_ROW + AUTOR_ROW + (2,)]])
+        repository = make_repository(LibroRepository, connection, self.redis)
+        for key in ("libro:7", "libros:all", "libros:by_autor:1", "libros:by_autor:2", "libros:by_autor:5"):
+            self.redis.data[key] = b"{}"
+
+        libro, autor = repository.update_with_autor(Libro.from_dict(dict(zip(
+            ("id", "titulo", "isbn", "anio_publicacion", "autor_id"), LIBRO_ROW
+        ))))
+
+        self.assertEqual(libro.id, 7)
+        self.assertEqual(autor.nombre, "Isabel Allende")
+        self.assertEqual(list(self.redis.data), ["libros:by_autor:5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from models.Autor import Autor
+from models.Libro import Libro
+from services.LibroService import LibroService
+
+
+class FakeLibroRepository:
+    """Repositorio de libros en memoria, ordenado por ID."""
+
+    def __init__(self, libros):
+        self.libros = libros
+        self.page_calls = []
+        self.yielded = 0
+
+    def get_page(self, limit, after_id=None):
+        self.page_calls.append((limit, after_id))
+        return [libro for libro in self.libros if libro.id > (after_id or 0)][:limit]
+
+    def iter_all_raw(self, page_size=1000):
+        for libro in self.libros:
+            self.yielded += 1
+            yield libro.to_dict()
+
+
+class FakeAutorRepository:
+    def __init__(self, autores):
+        self.autores = {autor.id: autor for autor in autores}
+        self.calls = []
+
+    def get_by_ids(self, ids):
+        ids = set(ids)
+        self.calls.append(ids)
+        return {i: self.autores[i] for i in ids if i in self.autores}
+
+
+def _libros(n, autor_ids):
+    return [
+        Libro(titulo=f"Libro {i}", isbn=f"{i:013d}", id=i, anio_publicacion=2000, autor_id=autor_ids[(i - 1) % len(autor_ids)])
+        for i in range(1, n + 1)
+    ]
+
+
+AUTORES = [Autor(id=1, nombre="Ana"), Autor(id=2, nombre="Beto")]
+
+
+class PaginacionTest(unittest.TestCase):
+
+    def _service(self, n):
+        self.libro_repo = FakeLibroRepository(_libros(n, [1, 2]))
+        self.autor_repo = FakeAutorRepository(AUTORES)
+        return LibroService(self.libro_repo, self.autor_repo)
+
+    def test_pide_una_fila_de_mas_y_devuelve_cursor(self):
+        service = self._service(5)
+
+        libros, next_cursor = service.obtener_todos_libros(page_size=2)
+
+        self.assertEqual(self.libro_repo.page_calls, [(3, None)])
+        self.assertEqual([libro["id"] for libro in libros], [1, 2])
+        self.assertEqual(next_cursor, 2)
+        self.assertEqual(libros[0]["autor"]["nombre"], "Ana")
+
+    def test_ultima_pagina_sin_cursor(self):
+        service = self._service(5)
+
+        libros, next_cursor = service.obtener_todos_libros(page_size=2, after_id=4)
+
+        self.assertEqual([libro["id"] for libro in libros], [5])
+        self.assertIsNone(next_cursor)
+
+    def test_pagina_exacta_sin_cursor(self):
+        service = self._service(4)
+
+        libros, next_cursor = service.obtener_todos_libros(page_size=4)
+
+        self.assertEqual(len(libros), 4)
+        self.assertIsNone(next_cursor)
+
+    def test_una_query_de_autores_por_pagina(self):
+        service = self._service(6)
+
+        service.obtener_todos_libros(page_size=6)
+
+        self.assertEqual(self.autor_repo.calls, [{1, 2}])
+
+    def test_valida_page_size_y_cursor(self):
+        service = self._service(1)
+
+        for kwargs in ({"page_size": 0}, {"page_size": 1001}, {"page_size": 10, "after_id": -1}):
+            with self.assertRaises(ValueError):
+                service.obtener_todos_libros(**kwargs)
+
+
+class StreamingTest(unittest.TestCase):
+
+    def test_enriquece_por_lotes_sin_retener_autores(self):
+        libro_repo = FakeLibroRepository(_libros(5, [1, 1, 2, 2, 3]))
+        autor_repo = FakeAutorRepository(AUTORES)
+        service = LibroService(libro_repo, autor_repo)
+
+        libros = list(service.iterar_libros(lote=2))
+
+        self.assertEqual([libro["id"] for libro in libros], [1, 2, 3, 4, 5])
+        # Cada lote consulta solo sus autores, aunque ya se hubieran obtenido antes
+        self.assertEqual(autor_repo.calls, [{1}, {2}, {3}])
+        self.assertEqual(libros[2]["autor"]["nombre"], "Beto")
+        self.assertIsNone(libros[4]["autor"], "autor inexistente")
+
+    def test_es_perezoso(self):
+        libro_repo = FakeLibroRepository(_libros(10, [1]))
+        service = LibroService(libro_repo, FakeAutorRepository(AUTORES))
+
+        libros = service.iterar_libros(lote=3)
+        next(libros)
+
+        self.assertEqual(libro_repo.yielded, 3, "solo se lee el primer lote")
+
+
+if __name__ == "__main__":
+    unittest.main()
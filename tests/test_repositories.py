@@ -0,0 +1,77 @@
+import io
+import unittest
+from repositories.AutorRepository import AutorRepository
+from repositories.LibroRepository import LIBRO_COLUMNS, LibroRepository
+from tests.fakes import FakeConnection, make_repository
+
+LIBRO_ROWS = [
+    (1, "Rayuela", "9788437604572", 1963, 2),
+    (2, "Ficciones", "9788420633121", 1944, 3),
+]
+
+
+class LibroRepositoryTest(unittest.TestCase):
+
+    def test_get_page_filtra_por_clave_sin_offset(self):
+        connection = FakeConnection([LIBRO_ROWS])
+        repository = make_repository(LibroRepository, connection)
+
+        libros = repository.get_page(3, after_id=10)
+
+        sql, params = connection.executed[0]
+        self.assertIn("WHERE id > %s ORDER BY id LIMIT %s", sql)
+        self.assertNotIn("OFFSET", sql)
+        self.assertNotIn("OVER", sql)
+        self.assertEqual(params, (10, 3))
+        self.assertEqual([libro.id for libro in libros], [1, 2])
+
+    def test_get_page_sin_cursor_empieza_desde_el_principio(self):
+        connection = FakeConnection([[]])
+        repository = make_repository(LibroRepository, connection)
+
+        self.assertEqual(repository.get_page(5), [])
+        self.assertEqual(connection.executed[0][1], (0, 5))
+
+    def test_iter_all_raw_usa_cursor_server_side_y_devuelve_dicts(self):
+        connection = FakeConnection([LIBRO_ROWS])
+        repository = make_repository(LibroRepository, connection)
+
+        filas = list(repository.iter_all_raw(page_size=500))
+
+        self.assertEqual(filas, [dict(zip(LIBRO_COLUMNS, row)) for row in LIBRO_ROWS])
+        self.assertIn("libros_iter_raw", connection.cursor_names)
+        self.assertEqual(connection.statements[0], "SET LOCAL idle_in_transaction_session_timeout = 0")
+        self.assertEqual(connection.statements[-1], "SET LOCAL idle_in_transaction_session_timeout = DEFAULT")
+        self.assertEqual(repository.db_pool.released, 1)
+
+    def test_iter_all_raw_es_perezoso(self):
+        connection = FakeConnection([LIBRO_ROWS])
+        repository = make_repository(LibroRepository, connection)
+
+        filas = repository.iter_all_raw()
+
+        self.assertEqual(connection.executed, [], "no debe consultar hasta que se consume")
+        next(filas)
+        self.assertEqual(len(connection.executed), 2)
+
+
+class AutorRepositoryExportTest(unittest.TestCase):
+
+    def test_export_csv_usa_copy_sin_statement_timeout(self):
+        csv = b"id,nombre,nacionalidad,fecha_nacimiento\n1,Isabel Allende,Chilena,1942-08-02\n"
+        connection = FakeConnection(copy_data=csv)
+        repository = make_repository(AutorRepository, connection)
+        out = io.BytesIO()
+
+        repository.export_csv(out)
+
+        self.assertEqual(out.getvalue(), csv)
+        self.assertEqual(connection.statements[0], "SET LOCAL statement_timeout = 0")
+        self.assertTrue(connection.statements[1].startswith("COPY ("))
+        self.assertIn("TO STDOUT WITH CSV HEADER", connection.statements[1])
+        self.assertEqual(connection.statements[2], "SET LOCAL statement_timeout = DEFAULT")
+        self.assertEqual(repository.db_pool.released, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()